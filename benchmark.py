@@ -0,0 +1,196 @@
+# Benchmarks for the solver, rotation, balance and PDF code paths
+#
+#   python benchmark.py -o before.json
+#   python benchmark.py -o after.json --compare before.json
+#
+# Each case is timed with timeit (auto-ranged loop count, best and median of
+# --repeat runs). A case's setup only runs if -k selects it. Results are
+# written as JSON; --compare reports the change against an earlier run on
+# stderr and exits with status 1 if any case got slower than --threshold
+# allows.
+
+import argparse
+import io
+import json
+import platform
+import statistics
+import sys
+import timeit
+from datetime import date, datetime, timedelta
+
+from scheduler_core import (AssignmentStore, assign_shifts, count_fri_sat_sun, generate_schedule, rotation_balance,
+                            solve_range)
+from scheduler_core.batch import iter_months
+
+MONTHS = [1, 12, 120]
+DOCTORS = [7, 30, 100, 500]
+ROTATION_YEARS = [1, 10, 50]
+PDF_MONTHS = [1, 12]
+START = date(2025, 1, 6)
+
+# ---------------------------
+# Cases
+
+def doctor_names(n):
+    return [f"Doctor {i:03d}" for i in range(n)]
+
+def month_range(n):
+    months = list(iter_months((2025, 1), (2025 + (n - 1) // 12, (n - 1) % 12 + 1)))
+    return months[0], months[-1]
+
+def solved_store(n_months, n_doctors):
+    store = AssignmentStore()
+    for result in solve_range(*month_range(n_months), doctor_names(n_doctors)):
+        store.update(result.assignments)
+    return store
+
+def rotation_week(n_doctors=7):
+    return doctor_names(n_doctors)[:7]
+
+# Each case is a setup function returning the zero-argument callable to
+# time, so the setup stays outside timing and only runs for selected cases
+
+def solve_case(n_months, n_doctors, solver=assign_shifts):
+    def setup():
+        first, last = month_range(n_months)
+        docs = doctor_names(n_doctors)
+        return lambda: solve_range(first, last, docs, solver=solver)
+    return setup
+
+def rotation_cases(years):
+    week = rotation_week()
+    end = START + timedelta(days=365*years)
+
+    def balance_setup():
+        schedule = generate_schedule(week, START, end)
+        return lambda: count_fri_sat_sun(schedule, week)
+    return {
+        f"rotation/generate/{years}y": lambda: lambda: generate_schedule(week, START, end),
+        f"rotation/balance/{years}y": lambda: lambda: rotation_balance(week, START, end, week),
+        f"balance/fri_sat_sun/{years}y": balance_setup,
+    }
+
+def balance_cases(n_doctors):
+    docs = doctor_names(n_doctors)
+
+    def panel_setup():
+        store = solved_store(120, n_doctors)
+        return lambda: [(store.count(doc, 5), store.count(doc, 6)) for doc in docs]
+
+    def scan_setup():
+        store = solved_store(120, n_doctors)
+        return lambda: [(sum(1 for d, v in store.items() if v == doc and d.weekday() == 5),
+                         sum(1 for d, v in store.items() if v == doc and d.weekday() == 6))
+                        for doc in docs]
+    return {
+        f"balance/panel/120m/{n_doctors}d": panel_setup,
+        f"balance/scan/120m/{n_doctors}d": scan_setup,
+    }
+
+def pdf_case(n_months):
+    def setup():
+        from scheduler_core.pdf_export import export_pdf
+        schedule = generate_schedule(rotation_week(), START, START + timedelta(days=30*n_months))
+        return lambda: export_pdf(schedule, io.BytesIO())
+    return setup
+
+def build_cases():
+    # name -> setup function
+    cases = {}
+    for n_months in MONTHS:
+        for n_doctors in DOCTORS:
+            cases[f"solve/{n_months}m/{n_doctors}d"] = solve_case(n_months, n_doctors)
+    try:
+        from scheduler_core.vectorized import assign_shifts_vectorized
+    except ImportError:
+        pass
+    else:
+        for n_months in MONTHS:
+            for n_doctors in DOCTORS:
+                cases[f"vectorized/{n_months}m/{n_doctors}d"] = solve_case(n_months, n_doctors,
+                                                                           assign_shifts_vectorized)
+    for years in ROTATION_YEARS:
+        cases.update(rotation_cases(years))
+    for n_doctors in DOCTORS:
+        cases.update(balance_cases(n_doctors))
+
+    try:
+        import fpdf  # noqa: F401
+    except ImportError:
+        return cases
+    for n_months in PDF_MONTHS:
+        cases[f"pdf/export/{n_months}m"] = pdf_case(n_months)
+    return cases
+
+# ---------------------------
+# Running
+
+def time_case(fn, repeat):
+    timer = timeit.Timer(fn)
+    number, _ = timer.autorange()
+    runs = [t / number for t in timer.repeat(repeat=repeat, number=number)]
+    return {"best": min(runs), "median": statistics.median(runs), "number": number, "repeat": repeat}
+
+def run(cases, repeat, selected=None, out=sys.stderr):
+    results = {}
+    for name, setup in cases.items():
+        if selected and not any(s in name for s in selected):
+            continue
+        results[name] = time_case(setup(), repeat)
+        print(f"{name:32s} {results[name]['best']*1000:10.3f} ms", file=out)
+    return {
+        "meta": {
+            "created": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "repeat": repeat,
+        },
+        "results": results,
+    }
+
+def compare(baseline, current, threshold, out=sys.stderr):
+    # Ratio of best times; > 1 is slower than the baseline
+    regressions = []
+    for name, result in current["results"].items():
+        base = baseline["results"].get(name)
+        if base is None:
+            print(f"{name:32s} {'new':>10s}", file=out)
+            continue
+        ratio = result["best"] / base["best"]
+        flag = ""
+        if ratio > 1 + threshold:
+            flag = "  REGRESSION"
+            regressions.append(name)
+        elif ratio < 1 - threshold:
+            flag = "  faster"
+        print(f"{name:32s} {base['best']*1000:10.3f} -> {result['best']*1000:10.3f} ms  x{ratio:.2f}{flag}", file=out)
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the scheduler core.")
+    parser.add_argument("-o", "--output", help="write results as JSON to this file")
+    parser.add_argument("--compare", help="baseline JSON from an earlier run")
+    parser.add_argument("--threshold", type=float, default=0.10, help="relative slowdown flagged as a regression")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("-k", "--select", action="append", help="only run cases whose name contains this")
+    args = parser.parse_args(argv)
+
+    current = run(build_cases(), args.repeat, args.select)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(current, f, indent=2)
+    else:
+        json.dump(current, sys.stdout, indent=2)
+        print()
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(baseline, current, args.threshold)
+        if regressions:
+            print(f"{len(regressions)} regression(s): {', '.join(regressions)}", file=sys.stderr)
+            return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -3,158 +3,142 @@
 
 import sys
 import calendar
-from datetime import date, timedelta
-from collections import defaultdict, deque
-import pickle
+import threading
+from datetime import date
+from collections import defaultdict
+import os
 
 from PySide6.QtWidgets import (
     QApplication, QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton,
-    QComboBox, QSpinBox, QTableWidget, QTableWidgetItem, QGroupBox, QGridLayout,
-    QCheckBox, QHeaderView, QMessageBox, QScrollArea
+    QComboBox, QSpinBox, QTableWidget, QTableWidgetItem, QGroupBox,
+    QCheckBox, QHeaderView, QMessageBox, QScrollArea, QTableView, QProgressBar
 )
-from PySide6.QtCore import Qt
+from PySide6.QtCore import Qt, QAbstractTableModel, QModelIndex, QObject, QRunnable, QThreadPool, Signal
+from PySide6.QtGui import QBrush
 
-# ---------------------------
-# Helper functions
-
-def month_dates(year, month):
-    first = date(year, month, 1)
-    _, last_day = calendar.monthrange(year, month)
-    return [first + timedelta(days=i) for i in range(last_day)]
-
-def categorize_dates(dates):
-    weekdays, fridays, saturdays, sundays = [], [], [], []
-    for d in dates:
-        wd = d.weekday()
-        if wd == 4:
-            fridays.append(d)
-        elif wd == 5:
-            saturdays.append(d)
-        elif wd == 6:
-            sundays.append(d)
-        else:
-            weekdays.append(d)
-    return weekdays, fridays, saturdays, sundays
+from scheduler_core import month_index, month_dates, resolve_changed_days, AssignmentStore
+from scheduler_core import FairnessState, iter_solve_range
+from scheduler_core import state_file, instrument
+
+STATE_FILE = "schedule_state.sched"
+LEGACY_STATE_FILE = "schedule_state.pkl"
 
 # ---------------------------
-# Scheduler logic
-
-def assign_shifts(dates, doctors, prev_assignments=None, weekend_history=None, friday_history=None):
-    if prev_assignments is None:
-        prev_assignments = {}
-    if weekend_history is None:
-        weekend_history = defaultdict(int)
-    if friday_history is None:
-        friday_history = defaultdict(int)
-
-    weekdays, fridays, saturdays, sundays = categorize_dates(dates)
-    assign_map = {}
-
-    last_weekend_doc = {}
-
-    def can_assign(doc, d, is_weekend=False):
-        # Strict 2-day gap
-        for delta in range(1,3):
-            if assign_map.get(d - timedelta(days=delta)) == doc:
-                return False
-            if assign_map.get(d + timedelta(days=delta)) == doc:
-                return False
-        if is_weekend:
-            prev_weekend = d - timedelta(days=7)
-            if last_weekend_doc.get(doc) and last_weekend_doc[doc] >= prev_weekend:
-                return False
-        return True
-
-    # Step 1: Weekends
-    weekend_days = sorted(saturdays + sundays)
-    total_weekends = len(weekend_days)
-    base_count = total_weekends // len(doctors)
-    extras = total_weekends - base_count*len(doctors)
-    weekend_assign_counts = defaultdict(int)
-
-    for d in weekend_days:
-        sorted_docs = sorted(doctors, key=lambda doc: (weekend_history[doc], weekend_assign_counts[doc]))
-        assigned = False
-        for doc in sorted_docs:
-            max_shifts = base_count + (1 if extras > 0 else 0)
-            if weekend_assign_counts[doc] >= max_shifts:
-                continue
-            if not can_assign(doc, d, is_weekend=True):
-                continue
-            assign_map[d] = doc
-            weekend_assign_counts[doc] += 1
-            weekend_history[doc] += 1
-            last_weekend_doc[doc] = d
-            if extras > 0 and weekend_assign_counts[doc] > base_count:
-                extras -= 1
-            assigned = True
-            break
-        if not assigned:
-            doc = sorted_docs[0]
-            assign_map[d] = doc
-            weekend_assign_counts[doc] += 1
-            weekend_history[doc] += 1
-            last_weekend_doc[doc] = d
-
-    # Step 2: Fridays
-    total_fridays = len(fridays)
-    base_count = total_fridays // len(doctors)
-    extras = total_fridays - base_count*len(doctors)
-    friday_assign_counts = defaultdict(int)
-
-    for d in fridays:
-        sorted_docs = sorted(doctors, key=lambda doc: (weekend_assign_counts[doc], friday_history[doc]))
-        assigned = False
-        for doc in sorted_docs:
-            max_shifts = base_count + (1 if extras > 0 else 0)
-            if friday_assign_counts[doc] >= max_shifts:
-                continue
-            if not can_assign(doc, d):
-                continue
-            assign_map[d] = doc
-            friday_assign_counts[doc] += 1
-            friday_history[doc] += 1
-            if extras > 0 and friday_assign_counts[doc] > base_count:
-                extras -= 1
-            assigned = True
-            break
-        if not assigned:
-            doc = sorted_docs[0]
-            assign_map[d] = doc
-            friday_assign_counts[doc] += 1
-            friday_history[doc] += 1
-
-    # Step 3: Weekdays
-    weekday_cycle = deque(doctors)
-    for d in weekdays:
-        for _ in range(len(weekday_cycle)):
-            doc = weekday_cycle[0]
-            if can_assign(doc, d):
-                assign_map[d] = doc
-                weekday_cycle.rotate(-1)
-                break
-            weekday_cycle.rotate(-1)
-        else:
-            assign_map[d] = weekday_cycle[0]
-            weekday_cycle.rotate(-1)
+# Background work
+
+class JobSignals(QObject):
+    progress = Signal(int, int)
+    result = Signal(object)
+    failed = Signal(str)
+    finished = Signal(bool)
+
+
+class Job(QRunnable):
+    # Runs fn(job) on the thread pool. fn works on its own copies of the app
+    # state, hands results back through job.result() (applied on the GUI
+    # thread) and returns early once job.cancelled is set.
+    def __init__(self, fn):
+        super().__init__()
+        self.setAutoDelete(False)
+        self.fn = fn
+        self.signals = JobSignals()
+        self._cancel = threading.Event()
+
+    @property
+    def cancelled(self):
+        return self._cancel.is_set()
+
+    def cancel(self):
+        self._cancel.set()
 
-    return assign_map
+    def progress(self, done, total):
+        self.signals.progress.emit(done, total)
+
+    def result(self, value):
+        if not self.cancelled:
+            self.signals.result.emit(value)
+
+    def run(self):
+        try:
+            self.fn(self)
+        except Exception as e:
+            self.signals.failed.emit(str(e))
+        finally:
+            self.signals.finished.emit(self.cancelled)
 
 # ---------------------------
 # GUI code
 
+class MonthCalendarModel(QAbstractTableModel):
+    # Week grid for a single month. Cells are drawn on demand from the app's
+    # assignment store and holiday sets, so nothing is kept per month.
+    HEADERS = ["Mon","Tue","Wed","Thu","Fri","Sat","Sun"]
+
+    def __init__(self, app, parent=None):
+        super().__init__(parent)
+        self.app = app
+        self.ym = None
+        self.weeks = ()
+
+    def set_month(self, ym):
+        self.beginResetModel()
+        self.ym = ym
+        self.weeks = month_index(*ym).weeks if ym else ()
+        self.endResetModel()
+
+    def day_at(self, row, col):
+        if 0 <= row < len(self.weeks) and 0 <= col < 7:
+            return self.weeks[row][col]
+        return 0
+
+    def refresh_day(self, day):
+        idx = self.index(*month_index(*self.ym).cell_of(day))
+        self.dataChanged.emit(idx, idx)
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.weeks)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else 7
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self.HEADERS[section]
+        return None
+
+    def data(self, index, role=Qt.DisplayRole):
+        day = self.day_at(index.row(), index.column())
+        if day == 0:
+            return "" if role == Qt.DisplayRole else None
+        year, month = self.ym
+        if role == Qt.DisplayRole:
+            doc_name = self.app.prev_assignments.get(month_index(year, month).dates[day - 1], "")
+            return f"{day}\n{doc_name}"
+        if role == Qt.TextAlignmentRole:
+            return Qt.AlignCenter
+        if role == Qt.BackgroundRole:
+            if (year, month, day) in self.app.temp_holiday_changes:
+                return QBrush(Qt.cyan)
+            if day in self.app.holidays.get(self.ym, ()):
+                return QBrush(Qt.yellow)
+        return None
+
+
 class SchedulerApp(QWidget):
     def __init__(self):
         super().__init__()
         self.setWindowTitle("Doctor Shift Scheduler")
         self.resize(1400, 850)
-        self.prev_assignments = {}
+        self.prev_assignments = AssignmentStore()
         self.weekend_history = defaultdict(int)
         self.friday_history = defaultdict(int)
         self.doctors = ["Αθηνά","Αλέξανδρος","Έλενα","Έλια","Εύα","Μαρία","Χριστίνα"]
-        self.generated_month_tables = {}
+        self.generated_months = []
         self.holidays = defaultdict(set)
         self.temp_holiday_changes = set()
+        self.pool = QThreadPool.globalInstance()
+        self.job = None
+        self.job_result_handler = None
         self.init_ui()
 
     def init_ui(self):
@@ -182,6 +166,13 @@ class SchedulerApp(QWidget):
         ym_layout.addWidget(self.month_combo)
         controls.addLayout(ym_layout)
 
+        months_layout = QHBoxLayout()
+        months_layout.addWidget(QLabel("Months to generate:"))
+        self.months_spin = QSpinBox()
+        self.months_spin.setRange(1, 120)
+        months_layout.addWidget(self.months_spin)
+        controls.addLayout(months_layout)
+
         self.start_balance_checkbox = QCheckBox("Start balance from this month")
         controls.addWidget(self.start_balance_checkbox)
 
@@ -210,6 +201,17 @@ class SchedulerApp(QWidget):
         self.apply_holidays_btn.clicked.connect(self.apply_holidays)
         controls.addWidget(self.apply_holidays_btn)
 
+        # Progress of the running background job
+        job_layout = QHBoxLayout()
+        self.progress_bar = QProgressBar()
+        self.cancel_btn = QPushButton("Cancel")
+        self.cancel_btn.clicked.connect(self.cancel_job)
+        job_layout.addWidget(self.progress_bar)
+        job_layout.addWidget(self.cancel_btn)
+        controls.addLayout(job_layout)
+        self.progress_bar.hide()
+        self.cancel_btn.hide()
+
         # Generated months combo
         controls.addWidget(QLabel("View Generated Month:"))
         self.generated_months_combo = QComboBox()
@@ -225,7 +227,7 @@ class SchedulerApp(QWidget):
         controls.addStretch()
         main_layout.addWidget(controls_group)
 
-        # Scrollable calendar
+        # Scrollable calendar: one view, showing whichever month is selected
         self.scroll_area = QScrollArea()
         self.scroll_area.setWidgetResizable(True)
         self.scroll_content = QWidget()
@@ -233,58 +235,124 @@ class SchedulerApp(QWidget):
         self.scroll_area.setWidget(self.scroll_content)
         main_layout.addWidget(self.scroll_area, stretch=2)
 
+        self.month_label = QLabel("")
+        self.calendar_model = MonthCalendarModel(self, self)
+        self.calendar_view = QTableView()
+        self.calendar_view.setModel(self.calendar_model)
+        self.calendar_view.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        self.calendar_view.verticalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        self.calendar_view.setWordWrap(True)
+        self.calendar_view.setEditTriggers(QTableView.NoEditTriggers)
+        self.calendar_view.clicked.connect(lambda idx: self.toggle_holiday_temp(idx.row(), idx.column()))
+        self.scroll_layout.addWidget(self.month_label)
+        self.scroll_layout.addWidget(self.calendar_view)
+
+        # Everything that reads or changes the schedule while a job runs
+        self.busy_widgets = [self.generate_btn, self.reset_btn, self.save_btn, self.load_btn,
+                             self.apply_holidays_btn, self.year_spin, self.month_combo, self.months_spin,
+                             self.start_balance_checkbox, self.calendar_view, self.generated_months_combo]
+
+    # ---------------------------
+    # Background jobs
+    def start_job(self, fn, on_result):
+        # Only one job at a time; the controls that read or change the
+        # schedule stay disabled until it finishes
+        job = Job(fn)
+        job.signals.progress.connect(self.on_job_progress)
+        job.signals.result.connect(self.on_job_result)
+        job.signals.failed.connect(self.on_job_failed)
+        job.signals.finished.connect(self.on_job_finished)
+        self.job = job
+        self.job_result_handler = on_result
+        for widget in self.busy_widgets:
+            widget.setEnabled(False)
+        self.progress_bar.setRange(0, 0)
+        self.progress_bar.show()
+        self.cancel_btn.setEnabled(True)
+        self.cancel_btn.show()
+        self.pool.start(job)
+
+    def cancel_job(self):
+        if self.job:
+            self.job.cancel()
+            self.cancel_btn.setEnabled(False)
+
+    def on_job_result(self, value):
+        # Results still queued when the job was cancelled are dropped
+        if self.job and not self.job.cancelled:
+            self.job_result_handler(value)
+
+    def on_job_progress(self, done, total):
+        self.progress_bar.setRange(0, total)
+        self.progress_bar.setValue(done)
+
+    def on_job_failed(self, message):
+        QMessageBox.warning(self, "Error", message)
+
+    def on_job_finished(self, cancelled):
+        self.job = None
+        self.job_result_handler = None
+        for widget in self.busy_widgets:
+            widget.setEnabled(True)
+        self.progress_bar.hide()
+        self.cancel_btn.hide()
+
+    def closeEvent(self, event):
+        self.cancel_job()
+        self.pool.waitForDone()
+        super().closeEvent(event)
+
     # ---------------------------
-    # Generate month
+    # Generate months
     def on_generate(self):
         year = int(self.year_spin.value())
         month = int(self.month_combo.currentData())
-        ym = (year, month)
-
-        if self.start_balance_checkbox.isChecked():
-            self.weekend_history = defaultdict(int)
-            self.friday_history = defaultdict(int)
-            self.prev_assignments = {}
+        n_months = self.months_spin.value()
+        last = year*12 + month - 1 + n_months - 1
 
+        # Starting the balance over only takes effect with the first solved
+        # month, so cancelling before then keeps the current state
+        reset = self.start_balance_checkbox.isChecked()
         self.temp_holiday_changes.clear()
-        self._generate_month(ym)
-
-    def _generate_month(self, ym):
+        # Solved off the GUI thread from a snapshot of the histories; each
+        # month is applied as soon as it arrives, and a cancelled run keeps
+        # the months already applied
+        if reset:
+            state = FairnessState.empty()
+        else:
+            state = FairnessState.from_histories(self.weekend_history, self.friday_history)
+        doctors = list(self.doctors)
+
+        def solve(job):
+            job.progress(0, n_months)
+            results = iter_solve_range((year, month), (last // 12, last % 12 + 1), doctors, state)
+            for done, result in enumerate(results, 1):
+                if job.cancelled:
+                    return
+                job.result((result, reset and done == 1))
+                job.progress(done, n_months)
+
+        self.start_job(solve, self.apply_month_result)
+
+    def apply_month_result(self, item):
+        rec = instrument.start("apply_month")
+        result, reset = item
+        ym = result.ym
         year, month = ym
-        dates = month_dates(year, month)
-        assign_map = assign_shifts(dates, self.doctors,
-                                   prev_assignments=self.prev_assignments,
-                                   weekend_history=self.weekend_history,
-                                   friday_history=self.friday_history)
-        self.prev_assignments.update({d: assign_map[d] for d in dates})
-
-        cal = calendar.Calendar(firstweekday=0)
-        month_matrix = cal.monthdayscalendar(year, month)
-        tbl = QTableWidget()
-        tbl.setRowCount(len(month_matrix))
-        tbl.setColumnCount(7)
-        tbl.setHorizontalHeaderLabels(["Mon","Tue","Wed","Thu","Fri","Sat","Sun"])
-        tbl.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
-        tbl.verticalHeader().setSectionResizeMode(QHeaderView.Stretch)
-        tbl.setWordWrap(True)
-        tbl.setEditTriggers(QTableWidget.NoEditTriggers)
-        tbl.cellClicked.connect(lambda r,c,ym=ym: self.toggle_holiday_temp(r,c))
+        if reset:
+            # Months from before the new balance start are gone with it
+            self.prev_assignments = AssignmentStore()
+            self.generated_months.clear()
+            self.generated_months_combo.blockSignals(True)
+            self.generated_months_combo.clear()
+            self.generated_months_combo.blockSignals(False)
+        self.prev_assignments.update(result.assignments)
+        self.weekend_history, self.friday_history = result.state.histories()
         self.current_year = year
         self.current_month = month
-        self.current_table = tbl
-
-        for r, week in enumerate(month_matrix):
-            for c, day in enumerate(week):
-                if day==0:
-                    item = QTableWidgetItem("")
-                else:
-                    doc_name = assign_map[date(year, month, day)]
-                    item = QTableWidgetItem(f"{day}\n{doc_name}")
-                    item.setTextAlignment(Qt.AlignCenter)
-                    if day in self.holidays[ym]:
-                        item.setBackground(Qt.yellow)
-                tbl.setItem(r,c,item)
-
-        self.generated_month_tables[ym] = tbl
+
+        if ym not in self.generated_months:
+            self.generated_months.append(ym)
         if self.generated_months_combo.findData(ym)==-1:
             self.generated_months_combo.addItem(f"{calendar.month_name[month]} {year}", ym)
             self.generated_months_combo.setCurrentIndex(self.generated_months_combo.count()-1)
@@ -294,37 +362,65 @@ class SchedulerApp(QWidget):
 
         self.update_balance_panel()
         self.show_month_table(ym)
+        if rec:
+            rec.lap("render")
+            instrument.finish(rec)
 
     # ---------------------------
     # Batch holiday selection
     def toggle_holiday_temp(self, row, col):
-        tbl = self.current_table
-        item = tbl.item(row, col)
-        if not item or item.text() == "":
+        day = self.calendar_model.day_at(row, col)
+        if day == 0:
             return
-        day = int(item.text().split("\n")[0])
         ym = (self.current_year, self.current_month)
         key = (ym[0], ym[1], day)
         if key in self.temp_holiday_changes:
             self.temp_holiday_changes.remove(key)
-            if day in self.holidays[ym]:
-                item.setBackground(Qt.yellow)
-            else:
-                item.setBackground(Qt.white)
         else:
             self.temp_holiday_changes.add(key)
-            item.setBackground(Qt.cyan)
+        self.calendar_model.refresh_day(day)
 
     def apply_holidays(self):
         ym = (self.current_year, self.current_month)
-        for y, m, day in self.temp_holiday_changes:
-            if day in self.holidays[ym]:
-                self.holidays[ym].remove(day)
-            else:
-                self.holidays[ym].add(day)
-        self.temp_holiday_changes.clear()
-        # Recalculate month
-        self._generate_month(ym)
+        if ym not in self.generated_months:
+            return
+        holidays = set(self.holidays[ym])
+        pending = frozenset(self.temp_holiday_changes)
+        changed_days = set()
+        for y, m, day in pending:
+            holidays ^= {day}
+            changed_days.add(date(y, m, day))
+        # Re-solve only the days the holiday changes can affect, on copies;
+        # the pending changes stay marked until the result is applied, so a
+        # cancelled run leaves everything as it was
+        dates = month_dates(*ym)
+        month_map = {d: self.prev_assignments[d] for d in dates}
+        weekend_history = defaultdict(int, self.weekend_history)
+        friday_history = defaultdict(int, self.friday_history)
+        doctors = list(self.doctors)
+
+        def solve(job):
+            new_map, cells = resolve_changed_days(month_map, dates, doctors, changed_days,
+                                                  weekend_history=weekend_history,
+                                                  friday_history=friday_history)
+            job.result((ym, holidays, pending, new_map, cells, weekend_history, friday_history))
+
+        self.start_job(solve, self.apply_holiday_result)
+
+    def apply_holiday_result(self, result):
+        ym, holidays, pending, month_map, cells, self.weekend_history, self.friday_history = result
+        self.holidays[ym] = holidays
+        # Only the toggles this run was started with have been applied
+        self.temp_holiday_changes -= pending
+        self.prev_assignments.update(month_map)
+        self.patch_month_cells(ym, cells)
+        self.update_balance_panel()
+
+    def patch_month_cells(self, ym, cells):
+        if self.calendar_model.ym != ym:
+            return
+        for cell in cells:
+            self.calendar_model.refresh_day(cell.date.day)
 
     # ---------------------------
     def show_selected_month(self, index):
@@ -334,15 +430,9 @@ class SchedulerApp(QWidget):
         self.show_month_table(ym)
 
     def show_month_table(self, ym):
-        for i in reversed(range(self.scroll_layout.count())):
-            widget = self.scroll_layout.itemAt(i).widget()
-            if widget:
-                widget.setParent(None)
-        label = QLabel(f"Schedule for {calendar.month_name[ym[1]]} {ym[0]}")
-        self.scroll_layout.addWidget(label)
-        self.scroll_layout.addWidget(self.generated_month_tables[ym])
+        self.month_label.setText(f"Schedule for {calendar.month_name[ym[1]]} {ym[0]}")
+        self.calendar_model.set_month(ym)
         self.current_year, self.current_month = ym
-        self.current_table = self.generated_month_tables[ym]
 
     # ---------------------------
     def update_balance_panel(self):
@@ -350,8 +440,8 @@ class SchedulerApp(QWidget):
         for i, doc in enumerate(self.doctors):
             self.balance_panel.setItem(i,0,QTableWidgetItem(doc))
             self.balance_panel.setItem(i,1,QTableWidgetItem(str(self.friday_history[doc])))
-            sat_count = sum(1 for d in self.prev_assignments if self.prev_assignments[d]==doc and d.weekday()==5)
-            sun_count = sum(1 for d in self.prev_assignments if self.prev_assignments[d]==doc and d.weekday()==6)
+            sat_count = self.prev_assignments.count(doc, 5)
+            sun_count = self.prev_assignments.count(doc, 6)
             self.balance_panel.setItem(i,2,QTableWidgetItem(str(sat_count)))
             self.balance_panel.setItem(i,3,QTableWidgetItem(str(sun_count)))
 
@@ -361,13 +451,15 @@ class SchedulerApp(QWidget):
         if idx<0:
             return
         ym = self.generated_months_combo.itemData(idx)
-        tbl = self.generated_month_tables[ym]
+        # Unparented, so it is freed once printed instead of living as long
+        # as the window
+        model = MonthCalendarModel(self)
+        model.set_month(ym)
         print(f"\nSchedule for {calendar.month_name[ym[1]]} {ym[0]}:\n")
-        for r in range(tbl.rowCount()):
+        for r in range(model.rowCount()):
             row_data = []
-            for c in range(tbl.columnCount()):
-                item = tbl.item(r,c)
-                row_data.append(item.text() if item else "")
+            for c in range(model.columnCount()):
+                row_data.append(model.data(model.index(r,c)))
             print("\t".join(row_data))
         print("\n")
 
@@ -376,15 +468,13 @@ class SchedulerApp(QWidget):
         self.prev_assignments.clear()
         self.weekend_history.clear()
         self.friday_history.clear()
-        self.generated_month_tables.clear()
+        self.generated_months.clear()
         self.generated_months_combo.clear()
         self.holidays.clear()
         self.temp_holiday_changes.clear()
         self.update_balance_panel()
-        for i in reversed(range(self.scroll_layout.count())):
-            widget = self.scroll_layout.itemAt(i).widget()
-            if widget:
-                widget.setParent(None)
+        self.month_label.setText("")
+        self.calendar_model.set_month(None)
 
     # ---------------------------
     def save_state(self):
@@ -392,28 +482,55 @@ class SchedulerApp(QWidget):
             "prev_assignments": self.prev_assignments,
             "weekend_history": dict(self.weekend_history),
             "friday_history": dict(self.friday_history),
-            "generated_months": list(self.generated_month_tables.keys()),
-            "holidays": {k:list(v) for k,v in self.holidays.items()}
+            "generated_months": list(self.generated_months),
+            "holidays": {k:list(v) for k,v in self.holidays.items()},
+            "doctors": list(self.doctors)
         }
-        with open("schedule_state.pkl","wb") as f:
-            pickle.dump(state,f)
-        QMessageBox.information(self,"Saved","Schedule state saved to schedule_state.pkl")
+        state_file.save_state(STATE_FILE, state)
+        QMessageBox.information(self,"Saved",f"Schedule state saved to {STATE_FILE}")
 
     # ---------------------------
     def load_state(self):
-        try:
-            with open("schedule_state.pkl","rb") as f:
-                state = pickle.load(f)
-            self.prev_assignments = state["prev_assignments"]
-            self.weekend_history = defaultdict(int, state["weekend_history"])
-            self.friday_history = defaultdict(int, state["friday_history"])
-            self.generated_month_tables.clear()
-            self.generated_months_combo.clear()
-            self.holidays = defaultdict(set,{k:set(v) for k,v in state.get("holidays",{}).items()})
-            for ym in state["generated_months"]:
-                self._generate_month(ym)
-        except Exception as e:
-            QMessageBox.warning(self,"Error",f"Failed to load: {e}")
+        # Reading and decoding a large state file happens off the GUI thread;
+        # restore_state only rebinds the loaded objects
+        def load(job):
+            try:
+                job.progress(0, 2)
+                if not os.path.exists(STATE_FILE) and os.path.exists(LEGACY_STATE_FILE):
+                    state_file.migrate_pickle(LEGACY_STATE_FILE, STATE_FILE)
+                job.progress(1, 2)
+                state = state_file.load_state(STATE_FILE)
+            except Exception as e:
+                raise RuntimeError(f"Failed to load: {e}") from e
+            job.progress(2, 2)
+            job.result(state)
+
+        self.start_job(load, self.restore_state)
+
+    def restore_state(self, state):
+        # Rehydrate the saved assignments and counters as they are; nothing is
+        # re-solved, so the fairness histories are not counted a second time.
+        # load_state already returns an AssignmentStore with its counters built.
+        self.prev_assignments = state["prev_assignments"]
+        self.weekend_history = defaultdict(int, state["weekend_history"])
+        self.friday_history = defaultdict(int, state["friday_history"])
+        self.holidays = defaultdict(set,{k:set(v) for k,v in state.get("holidays",{}).items()})
+        self.temp_holiday_changes.clear()
+        self.generated_months = [tuple(ym) for ym in state["generated_months"]]
+
+        self.generated_months_combo.blockSignals(True)
+        self.generated_months_combo.clear()
+        for year, month in self.generated_months:
+            self.generated_months_combo.addItem(f"{calendar.month_name[month]} {year}", (year, month))
+        self.generated_months_combo.setCurrentIndex(self.generated_months_combo.count()-1)
+        self.generated_months_combo.blockSignals(False)
+
+        self.update_balance_panel()
+        if self.generated_months:
+            self.show_month_table(self.generated_months[-1])
+        else:
+            self.month_label.setText("")
+            self.calendar_model.set_month(None)
 
 # ---------------------------
 # Main
@@ -1,139 +1,49 @@
 # doctor_shift_scheduler_streamlit.py
 import streamlit as st
-import pandas as pd
 import calendar
-from datetime import date, timedelta
-from collections import defaultdict, deque
-import pickle
+from datetime import date
+from collections import defaultdict
+import os
 
-# ---------------------------
-# Helper functions
-
-def month_dates(year, month):
-    first = date(year, month, 1)
-    _, last_day = calendar.monthrange(year, month)
-    return [first + timedelta(days=i) for i in range(last_day)]
+from scheduler_core import month_index, month_dates, resolve_changed_days, AssignmentStore
+from scheduler_core import state_file
+from scheduler_core.availability import Availability
+from scheduler_core.cache import LRUCache, stable_key, cached_assign_shifts
 
-def categorize_dates(dates):
-    weekdays, fridays, saturdays, sundays = [], [], [], []
-    for d in dates:
-        wd = d.weekday()
-        if wd == 4:
-            fridays.append(d)
-        elif wd == 5:
-            saturdays.append(d)
-        elif wd == 6:
-            sundays.append(d)
-        else:
-            weekdays.append(d)
-    return weekdays, fridays, saturdays, sundays
+STATE_FILE = "schedule_state.sched"
+LEGACY_STATE_FILE = "schedule_state.pkl"
 
 # ---------------------------
-# Scheduler logic
-
-def assign_shifts(dates, doctors, prev_assignments=None, weekend_history=None, friday_history=None, holidays=set()):
-    if prev_assignments is None:
-        prev_assignments = {}
-    if weekend_history is None:
-        weekend_history = defaultdict(int)
-    if friday_history is None:
-        friday_history = defaultdict(int)
-
-    weekdays, fridays, saturdays, sundays = categorize_dates(dates)
-    assign_map = {}
-
-    last_weekend_doc = {}
-
-    def can_assign(doc, d, is_weekend=False):
-        if d in holidays:
-            # holidays are still working shifts, so apply rules
-            pass
-        # strict 2-day gap
-        for delta in range(1,3):
-            if assign_map.get(d - timedelta(days=delta)) == doc:
-                return False
-            if assign_map.get(d + timedelta(days=delta)) == doc:
-                return False
-        if is_weekend:
-            prev_weekend = d - timedelta(days=7)
-            if last_weekend_doc.get(doc) and last_weekend_doc[doc] >= prev_weekend:
-                return False
-        return True
-
-    # --- Step1: Weekends
-    weekend_days = sorted(saturdays + sundays)
-    total_weekends = len(weekend_days)
-    base_count = total_weekends // len(doctors)
-    extras = total_weekends - base_count*len(doctors)
-    weekend_assign_counts = defaultdict(int)
-
-    for d in weekend_days:
-        sorted_docs = sorted(doctors, key=lambda doc: (weekend_history[doc], weekend_assign_counts[doc]))
-        assigned = False
-        for doc in sorted_docs:
-            max_shifts = base_count + (1 if extras>0 else 0)
-            if weekend_assign_counts[doc] >= max_shifts:
-                continue
-            if not can_assign(doc,d,is_weekend=True):
-                continue
-            assign_map[d] = doc
-            weekend_assign_counts[doc] +=1
-            weekend_history[doc] +=1
-            last_weekend_doc[doc] = d
-            if extras>0 and weekend_assign_counts[doc] > base_count:
-                extras -=1
-            assigned = True
-            break
-        if not assigned:
-            doc = sorted_docs[0]
-            assign_map[d] = doc
-            weekend_assign_counts[doc] +=1
-            weekend_history[doc] +=1
-            last_weekend_doc[doc] = d
-
-    # --- Step2: Fridays
-    total_fridays = len(fridays)
-    base_count = total_fridays // len(doctors)
-    extras = total_fridays - base_count*len(doctors)
-    friday_assign_counts = defaultdict(int)
-
-    for d in fridays:
-        sorted_docs = sorted(doctors, key=lambda doc: (weekend_assign_counts[doc], friday_history[doc]))
-        assigned = False
-        for doc in sorted_docs:
-            max_shifts = base_count + (1 if extras>0 else 0)
-            if friday_assign_counts[doc] >= max_shifts:
-                continue
-            if not can_assign(doc,d):
-                continue
-            assign_map[d] = doc
-            friday_assign_counts[doc] +=1
-            friday_history[doc] +=1
-            if extras>0 and friday_assign_counts[doc] > base_count:
-                extras -=1
-            assigned = True
-            break
-        if not assigned:
-            doc = sorted_docs[0]
-            assign_map[d] = doc
-            friday_assign_counts[doc] +=1
-            friday_history[doc] +=1
+# Cached results
+
+@st.cache_resource
+def result_cache():
+    # One cache per server process, shared by every session
+    return LRUCache(maxsize=256)
+
+DAY_TYPES = ["Weekday", "Friday", "Saturday", "Sunday"]
+
+def build_month_frame(ym, doctors_by_day, holidays):
+    import pandas as pd  # only once a month is on screen
+    idx = month_index(*ym)
+    return pd.DataFrame({
+        "Date": list(idx.dates),
+        "Weekday": [calendar.day_name[wd] for wd in idx.weekday],
+        "Doctor": doctors_by_day,
+        "DayType": [DAY_TYPES[c] for c in idx.day_class],
+        "Holiday": ["Yes" if flag else "" for flag in idx.holiday_flags(holidays)],
+    })
 
-    # --- Step3: Weekdays
-    weekday_cycle = deque(doctors)
-    for d in weekdays:
-        for _ in range(len(weekday_cycle)):
-            doc = weekday_cycle[0]
-            if can_assign(doc,d):
-                assign_map[d] = doc
-                weekday_cycle.rotate(-1)
-                break
-            weekday_cycle.rotate(-1)
-        else:
-            assign_map[d] = weekday_cycle[0]
-            weekday_cycle.rotate(-1)
+def month_frame(ym, doctors_by_day, holidays):
+    key = stable_key("month_frame", ym, list(doctors_by_day), set(holidays))
+    return result_cache().get_or_compute(key, lambda: build_month_frame(ym, doctors_by_day, holidays))
 
-    return assign_map
+def balance_frame(doctors, store):
+    # Not cached: the counts come straight from the store's counters, and a
+    # key built from them would cost as much as the frame itself
+    import pandas as pd
+    return pd.DataFrame([{"Doctor": doc, "Fridays": store.count(doc, 4), "Saturdays": store.count(doc, 5),
+                          "Sundays": store.count(doc, 6)} for doc in doctors])
 
 # ---------------------------
 # Streamlit App
@@ -141,7 +51,7 @@ def assign_shifts(dates, doctors, prev_assignments=None, weekend_history=None, f
 st.set_page_config(page_title="Doctor Shift Scheduler", layout="wide")
 
 if 'prev_assignments' not in st.session_state:
-    st.session_state.prev_assignments = {}
+    st.session_state.prev_assignments = AssignmentStore()
 if 'weekend_history' not in st.session_state:
     st.session_state.weekend_history = defaultdict(int)
 if 'friday_history' not in st.session_state:
@@ -152,6 +62,8 @@ if 'doctors' not in st.session_state:
     st.session_state.doctors = ["Αθηνά","Αλέξανδρος","Έλενα","Έλια","Εύα","Μαρία","Χριστίνα"]
 if 'generated_months' not in st.session_state:
     st.session_state.generated_months = []
+if 'availability' not in st.session_state:
+    st.session_state.availability = Availability()
 
 st.title("Doctor Shift Scheduler")
 
@@ -168,14 +80,14 @@ with col2:
         if start_balance:
             st.session_state.weekend_history = defaultdict(int)
             st.session_state.friday_history = defaultdict(int)
-            st.session_state.prev_assignments = {}
+            st.session_state.prev_assignments = AssignmentStore()
         ym = (year, month)
         dates = month_dates(year, month)
-        assign_map = assign_shifts(dates, st.session_state.doctors,
-                                   prev_assignments=st.session_state.prev_assignments,
-                                   weekend_history=st.session_state.weekend_history,
-                                   friday_history=st.session_state.friday_history,
-                                   holidays=st.session_state.holidays.get(ym,set()))
+        assign_map = cached_assign_shifts(result_cache(), dates, st.session_state.doctors,
+                                          weekend_history=st.session_state.weekend_history,
+                                          friday_history=st.session_state.friday_history,
+                                          holidays=st.session_state.holidays.get(ym,set()),
+                                          availability=st.session_state.availability)
         st.session_state.prev_assignments.update({d: assign_map[d] for d in dates})
         if ym not in st.session_state.generated_months:
             st.session_state.generated_months.append(ym)
@@ -186,71 +98,99 @@ with col2:
         st.session_state.friday_history.clear()
         st.session_state.generated_months.clear()
         st.session_state.holidays.clear()
+        st.session_state.availability = Availability()
 
     if st.button("Save State"):
-        with open("schedule_state.pkl","wb") as f:
-            pickle.dump(dict(st.session_state), f)
+        state_file.save_state(STATE_FILE, {k: st.session_state[k] for k in
+                                           ["prev_assignments","weekend_history","friday_history",
+                                            "generated_months","holidays","doctors","availability"]})
         st.success("Schedule state saved.")
 
     if st.button("Load State"):
         try:
-            with open("schedule_state.pkl","rb") as f:
-                data = pickle.load(f)
-            for k,v in data.items():
-                st.session_state[k] = v
+            if not os.path.exists(STATE_FILE) and os.path.exists(LEGACY_STATE_FILE):
+                state_file.migrate_pickle(LEGACY_STATE_FILE, STATE_FILE)
+            data = state_file.load_state(STATE_FILE)
+            st.session_state.prev_assignments = data["prev_assignments"]
+            st.session_state.weekend_history = defaultdict(int, data["weekend_history"])
+            st.session_state.friday_history = defaultdict(int, data["friday_history"])
+            st.session_state.generated_months = data["generated_months"]
+            st.session_state.holidays = defaultdict(set, {ym: {date(ym[0], ym[1], day) for day in days}
+                                                          for ym, days in data["holidays"].items()})
+            st.session_state.availability = data["availability"]
             st.success("State loaded.")
         except Exception as e:
             st.error(f"Failed to load: {e}")
 
+# Doctor leave
+with st.expander("Doctor Leave"):
+    leave_doc = st.selectbox("Doctor", st.session_state.doctors)
+    leave_range = st.date_input("Leave period", value=(date.today(), date.today()))
+    first, last = (leave_range[0], leave_range[-1]) if isinstance(leave_range, (tuple, list)) else (leave_range, leave_range)
+    if st.button("Add Leave") and first:
+        st.session_state.availability.add_leave(leave_doc, first, last)
+        # Hand the doctor's shifts in already generated months to someone
+        # else, keeping the rest of the month and the fairness histories
+        for ym in st.session_state.generated_months:
+            dates = month_dates(*ym)
+            hit = {d for d in dates if first <= d <= last and st.session_state.prev_assignments.get(d) == leave_doc}
+            if hit:
+                assign_map, _ = resolve_changed_days({d: st.session_state.prev_assignments[d] for d in dates},
+                                                     dates, st.session_state.doctors, hit,
+                                                     weekend_history=st.session_state.weekend_history,
+                                                     friday_history=st.session_state.friday_history,
+                                                     availability=st.session_state.availability)
+                st.session_state.prev_assignments.update(assign_map)
+    for doc in st.session_state.doctors:
+        days = st.session_state.availability.leave_days(doc)
+        if days:
+            st.write(f"{doc}: {len(days)} day(s), {days[0]} to {days[-1]}")
+    if st.button("Clear Leave"):
+        st.session_state.availability = Availability()
+
 # Select which month to view
 if st.session_state.generated_months:
     selected_ym = st.selectbox("View Month", st.session_state.generated_months)
     year, month = selected_ym
     dates = month_dates(year, month)
-    df = pd.DataFrame({
-        "Date": [d for d in dates],
-        "Weekday": [calendar.day_name[d.weekday()] for d in dates],
-        "Doctor": [st.session_state.prev_assignments[d] for d in dates]
-    })
 
     # Multi-select holidays
     holiday_options = [d for d in dates]
     holiday_selection = st.multiselect("Mark Holidays", holiday_options,
                                        default=list(st.session_state.holidays.get(selected_ym,set())))
+    changed_days = set(holiday_selection) ^ st.session_state.holidays.get(selected_ym, set())
     st.session_state.holidays[selected_ym] = set(holiday_selection)
 
-    # Recalculate after holidays
-    assign_map = assign_shifts(dates, st.session_state.doctors,
-                               prev_assignments={k:v for k,v in st.session_state.prev_assignments.items() if k<dates[0]},
-                               weekend_history=st.session_state.weekend_history,
-                               friday_history=st.session_state.friday_history,
-                               holidays=st.session_state.holidays[selected_ym])
-    st.session_state.prev_assignments.update({d: assign_map[d] for d in dates})
-
-    # Display schedule table
-    df['DayType'] = df['Weekday'].apply(lambda x: "Friday" if x=="Friday" else ("Saturday" if x=="Saturday" else ("Sunday" if x=="Sunday" else "Weekday")))
-    df['Holiday'] = df['Date'].apply(lambda d: "Yes" if d in st.session_state.holidays[selected_ym] else "")
+    # Re-solve only the days affected by holiday changes
+    if changed_days:
+        assign_map, _ = resolve_changed_days({d: st.session_state.prev_assignments[d] for d in dates},
+                                             dates, st.session_state.doctors, changed_days,
+                                             weekend_history=st.session_state.weekend_history,
+                                             friday_history=st.session_state.friday_history,
+                                             availability=st.session_state.availability)
+        st.session_state.prev_assignments.update(assign_map)
+
+    # Display schedule table (rebuilt only when the month's cells or holidays change)
+    df = month_frame(selected_ym, [st.session_state.prev_assignments[d] for d in dates],
+                     st.session_state.holidays[selected_ym])
     st.subheader(f"Schedule for {calendar.month_name[month]} {year}")
     st.dataframe(df.style.applymap(lambda x: 'background-color: yellow' if x=="Yes" else '', subset=['Holiday']),height=500)
 
     # Show balances
-    balance_data = []
-    for doc in st.session_state.doctors:
-        fridays = sum(1 for d in st.session_state.prev_assignments if st.session_state.prev_assignments[d]==doc and d.weekday()==4)
-        saturdays = sum(1 for d in st.session_state.prev_assignments if st.session_state.prev_assignments[d]==doc and d.weekday()==5)
-        sundays = sum(1 for d in st.session_state.prev_assignments if st.session_state.prev_assignments[d]==doc and d.weekday()==6)
-        balance_data.append({"Doctor":doc,"Fridays":fridays,"Saturdays":saturdays,"Sundays":sundays})
     st.subheader("Balance Panel")
-    st.dataframe(pd.DataFrame(balance_data))
+    st.dataframe(balance_frame(st.session_state.doctors, st.session_state.prev_assignments))
+
+    stats = result_cache().stats()
+    st.caption(f"Result cache: {stats.hits} hits, {stats.misses} misses, {stats.size}/{stats.maxsize} entries")
 
 # Optional print to console
 if st.button("Print Schedule"):
     if st.session_state.generated_months:
         selected_ym = st.session_state.generated_months[-1]
         year, month = selected_ym
-        dates = month_dates(year, month)
+        idx = month_index(year, month)
         print(f"\nSchedule for {calendar.month_name[month]} {year}")
-        for d in dates:
+        for d, is_holiday in zip(idx.dates, idx.holiday_flags(st.session_state.holidays[selected_ym])):
             doc = st.session_state.prev_assignments[d]
-            holiday_flag = "Holiday" if d in st.session_state.holidays[selected_ym] else ""
+            holiday_flag = "Holiday" if is_holiday else ""
             print(f"{d}: {doc} {holiday_flag}")
@@ -1,8 +1,11 @@
 import streamlit as st
 import datetime
-import calendar
-import pandas as pd
-from fpdf import FPDF
+import io
+import html
+
+from scheduler_core import generate_schedule, rotation_balance, count_fri_sat_sun, export_pdf, get_text_color, month_index
+from scheduler_core import instrument
+from scheduler_core.cache import LRUCache, stable_key
 
 # ----------------------------
 # 1. CONSTANTS
@@ -25,136 +28,130 @@ def get_week_dates(any_date):
     monday = any_date - datetime.timedelta(days=any_date.weekday())
     return [monday + datetime.timedelta(days=i) for i in range(7)]
 
-def get_text_color(rgb):
-    r, g, b = rgb
-    brightness = (r*299 + g*587 + b*114)/1000
-    return (0,0,0) if brightness > 125 else (255,255,255)
-
-# ----------------------------
-# 3. SCHEDULE GENERATION
-# ----------------------------
-def generate_schedule(initial_week, start_date, end_date):
-    schedule = {}
-    doctor_to_weekday = {doc: i for i, doc in enumerate(initial_week)}
-
-    # Preserve initial week
-    for i, doc in enumerate(initial_week):
-        schedule[start_date + datetime.timedelta(days=i)] = doc
-
-    current_week_start = start_date + datetime.timedelta(days=7)
+@st.cache_resource
+def result_cache():
+    # One cache per server process, shared by every session
+    return LRUCache(maxsize=64)
 
-    while current_week_start <= end_date:
-        new_doctor_to_weekday = {doc: (wd - 2) % 7 for doc, wd in doctor_to_weekday.items()}
-        for doc, wd in new_doctor_to_weekday.items():
-            day_date = current_week_start + datetime.timedelta(days=wd)
-            if day_date <= end_date:
-                schedule[day_date] = doc
-        doctor_to_weekday = new_doctor_to_weekday
-        current_week_start += datetime.timedelta(days=7)
-
-    return schedule
+def rotation_results(initial_week, start_date, end_date):
+    # (schedule, balance table), reused while the rotation inputs are unchanged
+    key = stable_key("rotation", list(initial_week), start_date, end_date)
+    return result_cache().get_or_compute(key, lambda: (
+        generate_schedule(initial_week, start_date, end_date),
+        compute_rotation_balance(initial_week, start_date, end_date)))
 
 # ----------------------------
-# 4. BALANCE TABLE
+# 3. BALANCE TABLE
 # ----------------------------
 def compute_balance_fri_sat_sun(schedule):
-    counts = {doc: {"Friday":0, "Saturday":0, "Sunday":0} for doc in DOCTORS}
-    for date, doc in schedule.items():
-        weekday = date.weekday()
-        if weekday == 4:
-            counts[doc]["Friday"] += 1
-        elif weekday == 5:
-            counts[doc]["Saturday"] += 1
-        elif weekday == 6:
-            counts[doc]["Sunday"] += 1
+    return balance_frame(count_fri_sat_sun(schedule, DOCTORS))
+
+def compute_rotation_balance(initial_week, start_date, end_date):
+    # Same table as compute_balance_fri_sat_sun(generate_schedule(...)),
+    # computed from the rotation period instead of the materialized schedule
+    return balance_frame(rotation_balance(initial_week, start_date, end_date, DOCTORS))
+
+def balance_frame(counts):
+    import pandas as pd  # only once a schedule has been generated
     df = pd.DataFrame.from_dict(counts, orient="index")
     df.index.name = "Doctor"
     df = df.reset_index()
     return df
 
 # ----------------------------
-# 5. PDF EXPORT
+# 4. PDF EXPORT
 # ----------------------------
 def create_pdf(schedule, filename="schedule_calendar.pdf"):
-    pdf = FPDF(orientation='L', unit='mm', format='A4')
-    pdf.set_auto_page_break(auto=True, margin=15)
-
-    last_month = None
-    pdf.set_font("Arial", "", 12)
-
-    for date in sorted(schedule.keys()):
-        month_name = date.strftime("%B %Y")
-        if month_name != last_month:
-            pdf.add_page()
-            pdf.set_font("Arial", "B", 16)
-            pdf.cell(0, 10, month_name, ln=True, align="C")
-            pdf.ln(3)
-            last_month = month_name
-
-            # Weekday header row
-            pdf.set_font("Arial", "B", 12)
-            days = ["Mon","Tue","Wed","Thu","Fri","Sat","Sun"]
-            col_width = pdf.w / 7 - 5
-            for d in days:
-                pdf.cell(col_width, 8, d, border=1, align='C')
-            pdf.ln()
-            pdf.set_font("Arial", "", 12)
-
-            # Weeks
-            cal = calendar.Calendar(firstweekday=0)
-            m_year, m_month = date.year, date.month
-            weeks = cal.monthdatescalendar(m_year, m_month)
-            for week in weeks:
-                for day in week:
-                    if day.month == m_month:
-                        doc = schedule.get(day, "")
-                        color = DOCTOR_COLORS.get(doc, (220,220,220))
-                        text_color = get_text_color(color)
-                        pdf.set_fill_color(*color)
-                        pdf.set_text_color(*text_color)
-                        pdf.cell(col_width, 20, f"{day.day}\n{doc}", border=1, ln=0, align='C', fill=True)
-                    else:
-                        pdf.set_fill_color(240,240,240)
-                        pdf.cell(col_width, 20, "", border=1, ln=0)
-                pdf.ln()
-    pdf.output(filename)
+    # filename may also be a writable file-like object
+    export_pdf(schedule, filename, colors=DOCTOR_COLORS)
     return filename
 
 # ----------------------------
-# 6. STREAMLIT CALENDAR DISPLAY
-# ----------------------------
-def display_calendar(schedule):
-    last_month = None
-    for date in sorted(schedule.keys()):
-        month_name = date.strftime("%B %Y")
-        if month_name != last_month:
-            st.markdown(f"## {month_name}")
-            last_month = month_name
-            m_year, m_month = date.year, date.month
-
-            # Weekday headers
-            header_cols = st.columns(7)
-            days = ["Mon","Tue","Wed","Thu","Fri","Sat","Sun"]
-            for i, d in enumerate(days):
-                header_cols[i].markdown(f"**{d}**", unsafe_allow_html=True)
-
-            cal = calendar.Calendar(firstweekday=0)
-            weeks = cal.monthdatescalendar(m_year, m_month)
-
-            for week in weeks:
-                cols = st.columns(7)
-                for i, day in enumerate(week):
-                    if day.month == m_month:
-                        doc = schedule.get(day, "")
-                        color = '#%02x%02x%02x' % DOCTOR_COLORS.get(doc, (220,220,220))
-                        cols[i].markdown(
-                            f"<div style='background-color:{color}; padding:6px; border-radius:4px; text-align:center'>"
-                            f"<b>{day.day}</b><br>{doc}</div>", unsafe_allow_html=True)
-                    else:
-                        cols[i].markdown("<div style='padding:6px'></div>", unsafe_allow_html=True)
-
-# ----------------------------
-# 7. STREAMLIT UI
+# 5. STREAMLIT CALENDAR DISPLAY
+# ----------------------------
+def build_month_cells(m_year, m_month, docs):
+    # Week rows of cell markup; docs holds the doctor for each day of the month
+    cells = []
+    for week in month_index(m_year, m_month).weeks:
+        row = []
+        for day in week:
+            if day:
+                doc = docs[day - 1]
+                color = '#%02x%02x%02x' % DOCTOR_COLORS.get(doc, (220,220,220))
+                row.append(f"<div style='background-color:{color}; padding:6px; border-radius:4px; text-align:center'>"
+                           f"<b>{day}</b><br>{html.escape(doc)}</div>")
+            else:
+                row.append("<div style='padding:6px'></div>")
+        cells.append(row)
+    return cells
+
+def build_month_grid(m_year, m_month, docs):
+    # The whole month as one CSS grid: header row, then one cell per day
+    parts = ["<div style='display:grid; grid-template-columns:repeat(7, 1fr); gap:4px'>"]
+    for d in ["Mon","Tue","Wed","Thu","Fri","Sat","Sun"]:
+        parts.append(f"<div style='text-align:center'><b>{d}</b></div>")
+    for week in month_index(m_year, m_month).weeks:
+        for day in week:
+            if day:
+                doc = docs[day - 1]
+                rgb = DOCTOR_COLORS.get(doc, (220,220,220))
+                parts.append(f"<div style='background-color:{'#%02x%02x%02x' % rgb}; color:{'#%02x%02x%02x' % get_text_color(rgb)}; "
+                             f"padding:6px; border-radius:4px; text-align:center'><b>{day}</b><br>{html.escape(doc)}</div>")
+            else:
+                parts.append("<div style='padding:6px'></div>")
+    parts.append("</div>")
+    return "".join(parts)
+
+def month_docs(schedule, m_year, m_month):
+    return [schedule.get(d, "") for d in month_index(m_year, m_month).dates]
+
+def month_cells(schedule, m_year, m_month):
+    docs = month_docs(schedule, m_year, m_month)
+    key = stable_key("month_cells", m_year, m_month, docs)
+    return result_cache().get_or_compute(key, lambda: build_month_cells(m_year, m_month, docs))
+
+def month_grid(schedule, m_year, m_month):
+    docs = month_docs(schedule, m_year, m_month)
+    key = stable_key("month_grid", m_year, m_month, docs)
+    return result_cache().get_or_compute(key, lambda: build_month_grid(m_year, m_month, docs))
+
+def schedule_months(schedule):
+    return sorted({(d.year, d.month) for d in schedule})
+
+def display_calendar(schedule, mode="grid", months=None):
+    # mode "grid" sends one HTML element per month, "columns" one per day;
+    # months limits the output to those (year, month) pages
+    rec = instrument.start("display_calendar")
+    for m_year, m_month in months or schedule_months(schedule):
+        st.markdown(f"## {datetime.date(m_year, m_month, 1).strftime('%B %Y')}")
+        if rec:
+            rec.count("months")
+
+        if mode == "grid":
+            st.markdown(month_grid(schedule, m_year, m_month), unsafe_allow_html=True)
+            if rec:
+                rec.count("elements", 2)
+            continue
+
+        # Weekday headers
+        header_cols = st.columns(7)
+        days = ["Mon","Tue","Wed","Thu","Fri","Sat","Sun"]
+        for i, d in enumerate(days):
+            header_cols[i].markdown(f"**{d}**", unsafe_allow_html=True)
+
+        rows = month_cells(schedule, m_year, m_month)
+        for row in rows:
+            cols = st.columns(7)
+            for i, cell in enumerate(row):
+                cols[i].markdown(cell, unsafe_allow_html=True)
+        if rec:
+            rec.count("elements", 9 + 8*len(rows))
+    if rec:
+        rec.lap("render")
+        instrument.finish(rec)
+
+# ----------------------------
+# 6. STREAMLIT UI
 # ----------------------------
 st.set_page_config(page_title="📅 Programma Giatron – Backwards Rotation", layout="wide")
 st.title("📅 Programma Giatron – Backwards Rotation")
@@ -218,22 +215,30 @@ with right_col:
 
     # ✅ Generate schedule & recalc balance immediately on single click
     if st.button("🗓️ Generate Schedule"):
-        st.session_state.generated_schedule = generate_schedule(
+        st.session_state.generated_schedule, st.session_state.balance_df = rotation_results(
             st.session_state.initial_week,
             start_month,
             end_month
         )
-        st.session_state.balance_df = compute_balance_fri_sat_sun(st.session_state.generated_schedule)
 
     # Display calendar
     if st.session_state.generated_schedule:
         st.subheader("📋 Calendar View")
-        display_calendar(st.session_state.generated_schedule)
+        all_months = schedule_months(st.session_state.generated_schedule)
+        view_col, layout_col = st.columns(2)
+        with view_col:
+            page = st.selectbox("Month", all_months + ["All months"],
+                                format_func=lambda ym: ym if isinstance(ym, str) else datetime.date(ym[0], ym[1], 1).strftime("%B %Y"))
+        with layout_col:
+            layout = st.radio("Layout", ["Grid", "Columns"], horizontal=True)
+        display_calendar(st.session_state.generated_schedule, mode=layout.lower(),
+                         months=all_months if page == "All months" else [page])
+        stats = result_cache().stats()
+        st.caption(f"Result cache: {stats.hits} hits, {stats.misses} misses, {stats.size}/{stats.maxsize} entries")
 
     # Export PDF
     if st.session_state.generated_schedule:
         st.subheader("📄 Export PDF")
         if st.button("🖨️ Export PDF"):
-            pdf_file = create_pdf(st.session_state.generated_schedule)
-            with open(pdf_file, "rb") as f:
-                st.download_button("⬇️ Download PDF", f, file_name="schedule_calendar.pdf")
+            pdf_buffer = create_pdf(st.session_state.generated_schedule, io.BytesIO())
+            st.download_button("⬇️ Download PDF", pdf_buffer.getvalue(), file_name="schedule_calendar.pdf")
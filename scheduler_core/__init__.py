@@ -0,0 +1,47 @@
+import importlib
+
+from .calendar_index import MonthIndex, month_index, month_dates, categorize_dates
+from .solver import assign_shifts
+from .delta import CellChange, affected_window, resolve_changed_days
+from .batch import FairnessState, MonthResult, iter_months, iter_solve_range, solve_range
+from .rotation import Rotation, generate_schedule, rotation_balance
+from .balance import count_fri_sat_sun, balance_spread, count_gap_violations
+from .optimize import OptimizeResult, optimize_schedule, assign_shifts_optimized
+from .store import AssignmentStore
+from .state_file import StateFile, StateFormatError, save_state, load_state, migrate_pickle
+from .cache import CacheStats, LRUCache, stable_key, history_fingerprint, cached_assign_shifts
+from .constraints import ConstraintChecker
+from .availability import Availability
+from .slots import Slot, SlotSchedule, assign_slots, rotation_slots
+
+# Names from modules with heavier imports (numpy, process pools, fpdf) are
+# loaded on first access, so importing the solver stays fast
+
+_LAZY = {
+    "assign_shifts_vectorized": "vectorized",
+    "ShiftScenario": "scenarios",
+    "RotationScenario": "scenarios",
+    "ScenarioResult": "scenarios",
+    "evaluate_scenario": "scenarios",
+    "run_scenarios": "scenarios",
+    "PageTemplate": "pdf_export",
+    "get_text_color": "pdf_export",
+    "page_template": "pdf_export",
+    "month_weeks": "pdf_export",
+    "iter_pages": "pdf_export",
+    "export_pdf": "pdf_export",
+    "RosterJob": "pdf_batch",
+    "roster_jobs": "pdf_batch",
+    "export_rosters": "pdf_batch",
+}
+
+def __getattr__(name):
+    module = _LAZY.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{module}", __name__), name)
+    globals()[name] = value
+    return value
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY))
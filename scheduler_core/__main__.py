@@ -0,0 +1,6 @@
+# python -m scheduler_core ...
+import sys
+
+from .cli import main
+
+sys.exit(main())
@@ -0,0 +1,108 @@
+# Per-doctor leave and availability
+#
+# Leave is kept per doctor as an int bitmask over day ordinals, starting at
+# that doctor's earliest leave day, so adding a range is a single OR and a
+# lookup is a shift. A doctor can also be limited to certain weekdays (e.g.
+# a part-timer who never works Fridays). The solvers turn both into a
+# blocked-day mask over their own horizon once per solve, after which every
+# check is constant time.
+
+from datetime import date
+
+ALL_WEEKDAYS = 0b1111111
+
+
+class Availability:
+    def __init__(self):
+        self._leave = {}     # doc -> (origin ordinal, bitmask)
+        self._weekdays = {}  # doc -> 7-bit mask of weekdays the doctor works
+
+    def __bool__(self):
+        return any(bits for _, bits in self._leave.values()) or bool(self._weekdays)
+
+    def copy(self):
+        other = Availability()
+        other._leave = dict(self._leave)
+        other._weekdays = dict(self._weekdays)
+        return other
+
+    # ---------------------------
+    # Editing
+
+    def add_leave(self, doc, first, last=None):
+        lo = first.toordinal()
+        hi = (last or first).toordinal()
+        origin, bits = self._leave.get(doc, (lo, 0))
+        if lo < origin:
+            bits <<= origin - lo
+            origin = lo
+        bits |= ((1 << (hi - lo + 1)) - 1) << (lo - origin)
+        self._leave[doc] = (origin, bits)
+
+    def remove_leave(self, doc, first, last=None):
+        if doc not in self._leave:
+            return
+        origin, bits = self._leave[doc]
+        lo = max(first.toordinal(), origin)
+        hi = (last or first).toordinal()
+        if hi >= lo:
+            bits &= ~(((1 << (hi - lo + 1)) - 1) << (lo - origin))
+        self._leave[doc] = (origin, bits)
+
+    def set_weekdays(self, doc, weekdays=None):
+        # weekdays: Monday=0 .. Sunday=6 the doctor can work; None for all
+        if weekdays is None:
+            self._weekdays.pop(doc, None)
+        else:
+            self._weekdays[doc] = sum(1 << wd for wd in set(weekdays))
+
+    # ---------------------------
+    # Lookups
+
+    def is_available(self, doc, d):
+        if doc in self._weekdays and not self._weekdays[doc] >> d.weekday() & 1:
+            return False
+        if doc in self._leave:
+            origin, bits = self._leave[doc]
+            offset = d.toordinal() - origin
+            return offset < 0 or not bits >> offset & 1
+        return True
+
+    def leave_days(self, doc):
+        origin, bits = self._leave.get(doc, (0, 0))
+        days = []
+        offset = 0
+        while bits:
+            if bits & 1:
+                days.append(date.fromordinal(origin + offset))
+            bits >>= 1
+            offset += 1
+        return days
+
+    def blocked_bits(self, doc, first_ordinal, n_days):
+        # Bit i set if doc cannot work on day first_ordinal + i
+        bits = 0
+        if doc in self._leave:
+            origin, leave = self._leave[doc]
+            shift = first_ordinal - origin
+            bits = (leave >> shift if shift >= 0 else leave << -shift) & ((1 << n_days) - 1)
+        allowed = self._weekdays.get(doc, ALL_WEEKDAYS)
+        if allowed != ALL_WEEKDAYS:
+            first_wd = (first_ordinal + 6) % 7
+            for i in range(n_days):
+                if not allowed >> ((first_wd + i) % 7) & 1:
+                    bits |= 1 << i
+        return bits
+
+    def fingerprint(self):
+        return (tuple(sorted((doc, origin, bits) for doc, (origin, bits) in self._leave.items() if bits)),
+                tuple(sorted(self._weekdays.items())))
+
+    @classmethod
+    def from_fingerprint(cls, fingerprint):
+        # Inverse of fingerprint(); used to read leave back from saved state
+        leave, weekdays = fingerprint
+        other = cls()
+        other._leave = {doc: (origin, bits) for doc, origin, bits in leave if bits}
+        other._weekdays = dict(weekdays)
+        return other
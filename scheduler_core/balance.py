@@ -0,0 +1,29 @@
+# Fairness metrics over a finished schedule ({date: doctor})
+
+WEEKEND_CLASSES = {4: "Friday", 5: "Saturday", 6: "Sunday"}
+
+
+def count_fri_sat_sun(schedule, doctors):
+    counts = {doc: {"Friday":0, "Saturday":0, "Sunday":0} for doc in doctors}
+    for d, doc in schedule.items():
+        day_class = WEEKEND_CLASSES.get(d.weekday())
+        if day_class:
+            counts.setdefault(doc, {"Friday":0, "Saturday":0, "Sunday":0})[day_class] += 1
+    return counts
+
+def balance_spread(counts):
+    # Sum over Fri/Sat/Sun of the gap between the busiest and idlest doctor
+    if not counts:
+        return 0
+    return sum(max(c[k] for c in counts.values()) - min(c[k] for c in counts.values())
+               for k in ("Friday", "Saturday", "Sunday"))
+
+def count_gap_violations(schedule, gap=2):
+    # Pairs of shifts by the same doctor less than gap+1 days apart
+    by_ordinal = {d.toordinal(): doc for d, doc in schedule.items()}
+    violations = 0
+    for day, doc in by_ordinal.items():
+        for delta in range(1, gap+1):
+            if by_ordinal.get(day + delta) == doc:
+                violations += 1
+    return violations
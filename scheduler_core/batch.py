@@ -0,0 +1,66 @@
+# Headless multi-month solving
+#
+# Fairness carries from one month to the next through the weekend and Friday
+# histories. FairnessState is an immutable snapshot of those histories, so a
+# range of months can be solved in one pass without a GUI, and any month's
+# snapshot can be kept, compared or used to resume planning later.
+
+from collections import defaultdict, namedtuple
+
+from .calendar_index import month_dates
+from .solver import assign_shifts
+
+MonthResult = namedtuple("MonthResult", ["ym", "assignments", "state"])
+
+
+class FairnessState(namedtuple("FairnessState", ["weekend_history", "friday_history"])):
+    __slots__ = ()
+
+    @classmethod
+    def empty(cls):
+        return cls((), ())
+
+    @classmethod
+    def from_histories(cls, weekend_history, friday_history):
+        return cls(tuple(sorted((doc, n) for doc, n in weekend_history.items() if n)),
+                   tuple(sorted((doc, n) for doc, n in friday_history.items() if n)))
+
+    def histories(self):
+        # Fresh mutable copies for the solver to update
+        return defaultdict(int, self.weekend_history), defaultdict(int, self.friday_history)
+
+# ---------------------------
+# Months
+
+def next_month(ym):
+    year, month = ym
+    return (year + 1, 1) if month == 12 else (year, month + 1)
+
+def iter_months(start_ym, end_ym):
+    ym = tuple(start_ym)
+    while ym <= tuple(end_ym):
+        yield ym
+        ym = next_month(ym)
+
+# ---------------------------
+# Solving
+
+def iter_solve_range(start_ym, end_ym, doctors, state=None, solver=assign_shifts, holidays=None, availability=None):
+    # Yields each month's result as soon as it is solved; holidays is a
+    # collection of dates across the whole range
+    if state is None:
+        state = FairnessState.empty()
+    weekend_history, friday_history = state.histories()
+    holidays = set(holidays or ())
+    extra = {"availability": availability} if availability else {}
+    for ym in iter_months(start_ym, end_ym):
+        dates = month_dates(*ym)
+        assign_map = solver(dates, doctors,
+                            weekend_history=weekend_history,
+                            friday_history=friday_history,
+                            holidays={d for d in dates if d in holidays},
+                            **extra)
+        yield MonthResult(ym, assign_map, FairnessState.from_histories(weekend_history, friday_history))
+
+def solve_range(start_ym, end_ym, doctors, state=None, solver=assign_shifts, holidays=None, availability=None):
+    return list(iter_solve_range(start_ym, end_ym, doctors, state, solver, holidays, availability))
@@ -0,0 +1,103 @@
+# Result cache keyed on solver inputs
+#
+# Streamlit re-runs the whole script on every widget interaction. Keying
+# solves and derived tables on a stable hash of their inputs (doctor list,
+# dates, holidays, fairness history) lets an unchanged rerun reuse the
+# previous result. LRUCache is thread-safe so one instance can be shared by
+# every session on a server.
+
+import hashlib
+import threading
+from collections import OrderedDict, namedtuple
+from datetime import date
+
+from .solver import assign_shifts
+
+CacheStats = namedtuple("CacheStats", ["hits", "misses", "size", "maxsize"])
+
+# ---------------------------
+# Keys
+
+def _canonical(value):
+    if isinstance(value, dict):
+        return "{" + ",".join(sorted(f"{_canonical(k)}:{_canonical(v)}" for k, v in value.items())) + "}"
+    if isinstance(value, (set, frozenset)):
+        return "s{" + ",".join(sorted(_canonical(v) for v in value)) + "}"
+    if isinstance(value, (list, tuple)):
+        return "[" + ",".join(_canonical(v) for v in value) + "]"
+    if isinstance(value, date):
+        return value.isoformat()
+    return repr(value)
+
+def stable_key(*parts):
+    return hashlib.blake2b(_canonical(parts).encode("utf-8"), digest_size=16).hexdigest()
+
+def history_fingerprint(weekend_history, friday_history):
+    return stable_key({k: v for k, v in weekend_history.items() if v},
+                      {k: v for k, v in friday_history.items() if v})
+
+# ---------------------------
+# Cache
+
+class LRUCache:
+    def __init__(self, maxsize=128):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return self._data[key]
+            self.misses += 1
+            return default
+
+    def put(self, key, value):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def get_or_compute(self, key, compute):
+        missing = object()
+        value = self.get(key, missing)
+        if value is missing:
+            value = compute()
+            self.put(key, value)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.hits = self.misses = 0
+
+    def stats(self):
+        with self._lock:
+            return CacheStats(self.hits, self.misses, len(self._data), self.maxsize)
+
+# ---------------------------
+# Cached solving
+
+def cached_assign_shifts(cache, dates, doctors, weekend_history, friday_history, holidays=None, solver=assign_shifts,
+                         availability=None):
+    # assign_shifts updates the histories in place, so the cache keeps the
+    # histories it produced and replays them on a hit
+    key = stable_key("assign_shifts", getattr(solver, "__name__", repr(solver)), list(dates), list(doctors),
+                     set(holidays or ()), history_fingerprint(weekend_history, friday_history),
+                     availability.fingerprint() if availability else None)
+    cached = cache.get(key)
+    if cached is None:
+        extra = {"availability": availability} if availability else {}
+        assign_map = solver(dates, doctors, weekend_history=weekend_history,
+                            friday_history=friday_history, holidays=holidays, **extra)
+        cached = (dict(assign_map), dict(weekend_history), dict(friday_history))
+        cache.put(key, cached)
+    else:
+        weekend_history.update(cached[1])
+        friday_history.update(cached[2])
+    return dict(cached[0])
@@ -0,0 +1,74 @@
+# Shared calendar index
+#
+# Per-month facts used by the solver and all three front-ends: the day range,
+# weekday and weekday-class of each day, and the Monday-first week grid. Each
+# month is built once and memoized per (year, month); the per-day data is
+# held as compact int arrays indexed by day - 1.
+
+from array import array
+from datetime import date
+from functools import lru_cache
+
+# Weekday classes
+WEEKDAY, FRIDAY, SATURDAY, SUNDAY = 0, 1, 2, 3
+WEEKDAY_CLASS = (WEEKDAY, WEEKDAY, WEEKDAY, WEEKDAY, FRIDAY, SATURDAY, SUNDAY)
+
+
+class MonthIndex:
+    def __init__(self, year, month):
+        self.year = year
+        self.month = month
+        first = date(year, month, 1)
+        self.first_ordinal = first.toordinal()
+        self.first_weekday = first.weekday()
+        self.n_days = (date(year + 1, 1, 1) if month == 12 else date(year, month + 1, 1)).toordinal() - self.first_ordinal
+        self.weekday = array("b", [(self.first_weekday + i) % 7 for i in range(self.n_days)])
+        self.day_class = array("b", [WEEKDAY_CLASS[wd] for wd in self.weekday])
+        # Week rows of day numbers, 0 for days that belong to a neighbouring month
+        cells = [0]*self.first_weekday + list(range(1, self.n_days + 1))
+        cells += [0]*(-len(cells) % 7)
+        self.weeks = tuple(tuple(cells[i:i+7]) for i in range(0, len(cells), 7))
+        self.dates = tuple(date.fromordinal(self.first_ordinal + i) for i in range(self.n_days))
+        self.by_class = tuple(tuple(d for d, c in zip(self.dates, self.day_class) if c == k)
+                              for k in (WEEKDAY, FRIDAY, SATURDAY, SUNDAY))
+
+    def days(self):
+        return range(1, self.n_days + 1)
+
+    def cell_of(self, day):
+        # (row, column) of a day in the week grid
+        return divmod(self.first_weekday + day - 1, 7)
+
+    def holiday_flags(self, holidays):
+        # One byte per day, 1 for holidays; accepts day numbers or dates
+        flags = bytearray(self.n_days)
+        for h in holidays:
+            if isinstance(h, date):
+                if (h.year, h.month) != (self.year, self.month):
+                    continue
+                h = h.day
+            if 1 <= h <= self.n_days:
+                flags[h - 1] = 1
+        return flags
+
+@lru_cache(maxsize=None)
+def month_index(year, month):
+    return MonthIndex(year, month)
+
+# ---------------------------
+# Date lists
+
+def month_dates(year, month):
+    return list(month_index(year, month).dates)
+
+def categorize_dates(dates):
+    # (weekdays, fridays, saturdays, sundays); a whole month in order comes
+    # straight from the index
+    if dates and dates[0].day == 1:
+        idx = month_index(dates[0].year, dates[0].month)
+        if len(dates) == idx.n_days and dates[-1] == idx.dates[-1]:
+            return tuple(list(group) for group in idx.by_class)
+    groups = ([], [], [], [])
+    for d in dates:
+        groups[WEEKDAY_CLASS[d.weekday()]].append(d)
+    return groups
@@ -0,0 +1,242 @@
+# Headless roster generation
+#
+# Command-line entry point for cron jobs and pipelines, without the Qt or
+# Streamlit front-ends:
+#
+#   python -m scheduler_core shifts --doctors doctors.txt --start 2025-01 --end 2025-12
+#   python -m scheduler_core rotation --initial-week week.txt --start 2025-01-06 --end 2025-06-30
+#
+# Doctor, holiday and initial-week files hold one entry per line (blank lines
+# and # comments ignored) or a JSON list. A leave file is CSV rows of
+# doctor,first[,last] with ISO dates. Rows are written as CSV or JSON
+# lines month by month as they are solved; timing goes to stderr.
+
+import argparse
+import csv
+import io
+import json
+import os
+import sys
+import time
+from datetime import date
+
+from .availability import Availability
+from .batch import FairnessState, iter_solve_range
+from .rotation import generate_schedule
+from . import state_file
+
+DAY_NAMES = ["Monday","Tuesday","Wednesday","Thursday","Friday","Saturday","Sunday"]
+
+# ---------------------------
+# Inputs
+
+class InputError(ValueError):
+    pass
+
+def read_text(path):
+    # Missing or unreadable files are bad input like any other
+    try:
+        with open(path, encoding="utf-8", newline="") as f:
+            return f.read()
+    except OSError as e:
+        raise InputError(f"{path}: {e.strerror}") from None
+    except UnicodeDecodeError:
+        raise InputError(f"{path}: not a UTF-8 text file") from None
+
+def read_list(path):
+    text = read_text(path)
+    if text.lstrip().startswith("["):
+        try:
+            return [str(item) for item in json.loads(text)]
+        except ValueError as e:
+            raise InputError(f"{path}: invalid JSON list: {e}") from None
+    entries = []
+    for line in text.splitlines():
+        line = line.split("#", 1)[0].strip()
+        if line:
+            entries.append(line)
+    return entries
+
+def read_leave(path, doctors):
+    # Rows naming a doctor who is not on the roster are an error rather than
+    # leave that silently never applies
+    roster = set(doctors)
+    availability = Availability()
+    for line, row in enumerate(csv.reader(io.StringIO(read_text(path))), 1):
+        if not row or row[0].lstrip().startswith("#"):
+            continue
+        doc = row[0].strip()
+        if doc not in roster:
+            raise InputError(f"{path}:{line}: unknown doctor {doc!r}")
+        try:
+            first = parse_date(row[1].strip())
+            last = parse_date(row[2].strip()) if len(row) > 2 and row[2].strip() else first
+        except (IndexError, argparse.ArgumentTypeError):
+            raise InputError(f"{path}:{line}: expected doctor,first[,last] with ISO dates") from None
+        availability.add_leave(doc, first, last)
+    return availability
+
+def read_dates(path):
+    try:
+        return {parse_date(text) for text in read_list(path)}
+    except argparse.ArgumentTypeError as e:
+        raise InputError(f"{path}: {e}") from None
+
+def read_state(path):
+    try:
+        return state_file.load_state(path)
+    except OSError as e:
+        raise InputError(f"{path}: {e.strerror}") from None
+    except state_file.StateFormatError as e:
+        raise InputError(f"{path}: {e}") from None
+
+def check_range(start, end):
+    # An empty range would otherwise succeed silently with no output
+    if start > end:
+        raise InputError("--start is after --end")
+
+# Used as argparse type= callables, so bad values are reported as usage errors
+
+def parse_month(text):
+    try:
+        year, month = (int(part) for part in text.split("-"))
+        date(year, month, 1)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid month {text!r}, expected YYYY-MM") from None
+    return year, month
+
+def parse_date(text):
+    try:
+        return date.fromisoformat(text)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid date {text!r}, expected YYYY-MM-DD") from None
+
+# ---------------------------
+# Output
+
+class RowWriter:
+    FIELDS = ["date", "weekday", "doctor", "holiday"]
+
+    def __init__(self, stream, fmt):
+        self.stream = stream
+        self.fmt = fmt
+        self.rows = 0
+        if fmt == "csv":
+            self.csv = csv.writer(stream, lineterminator="\n")
+            self.csv.writerow(self.FIELDS)
+
+    def write(self, d, doctor, holiday=False):
+        if self.fmt == "csv":
+            self.csv.writerow([d.isoformat(), DAY_NAMES[d.weekday()], doctor, "yes" if holiday else ""])
+        else:
+            self.stream.write(json.dumps({"date": d.isoformat(), "weekday": DAY_NAMES[d.weekday()],
+                                          "doctor": doctor, "holiday": holiday}, ensure_ascii=False) + "\n")
+        self.rows += 1
+
+    def flush(self):
+        self.stream.flush()
+
+def open_output(path):
+    if path in (None, "-"):
+        return sys.stdout, False
+    return open(path, "w", encoding="utf-8", newline=""), True
+
+# ---------------------------
+# Commands
+
+def run_shifts(args, writer):
+    check_range(args.start, args.end)
+    doctors = read_list(args.doctors)
+    if not doctors:
+        raise InputError(f"{args.doctors}: no doctors listed")
+    holidays = read_dates(args.holidays) if args.holidays else set()
+    availability = read_leave(args.leave, doctors) if args.leave else None
+    state = FairnessState.empty()
+    if args.state:
+        saved = read_state(args.state)
+        state = FairnessState.from_histories(saved["weekend_history"], saved["friday_history"])
+
+    assignments = {}
+    months = []
+    for result in iter_solve_range(args.start, args.end, doctors, state,
+                                   holidays=holidays, availability=availability):
+        for d in sorted(result.assignments):
+            writer.write(d, result.assignments[d], d in holidays)
+        writer.flush()
+        assignments.update(result.assignments)
+        months.append(result.ym)
+        state = result.state
+
+    if args.save_state:
+        weekend_history, friday_history = state.histories()
+        state_file.save_state(args.save_state, {
+            "prev_assignments": assignments, "weekend_history": weekend_history,
+            "friday_history": friday_history, "generated_months": months,
+            "holidays": {ym: {d.day for d in holidays if (d.year, d.month) == ym} for ym in months},
+            "doctors": doctors, "availability": availability,
+        })
+    return len(months)
+
+def run_rotation(args, writer):
+    check_range(args.start, args.end)
+    initial_week = read_list(args.initial_week)
+    if not initial_week:
+        raise InputError(f"{args.initial_week}: no doctors listed")
+    schedule = generate_schedule(initial_week, args.start, args.end)
+    months = set()
+    for d in sorted(schedule):
+        writer.write(d, schedule[d])
+        months.add((d.year, d.month))
+    writer.flush()
+    return len(months)
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="python -m scheduler_core", description="Generate doctor rosters without a GUI.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    shifts = sub.add_parser("shifts", help="fair monthly shift assignment")
+    shifts.add_argument("--doctors", required=True, help="file with one doctor per line, or a JSON list")
+    shifts.add_argument("--start", required=True, type=parse_month, help="first month, YYYY-MM")
+    shifts.add_argument("--end", required=True, type=parse_month, help="last month, YYYY-MM")
+    shifts.add_argument("--holidays", help="file with one ISO date per line, or a JSON list")
+    shifts.add_argument("--leave", help="CSV of doctor,first[,last] leave periods")
+    shifts.add_argument("--state", help="continue the fairness histories of a saved .sched state")
+    shifts.add_argument("--save-state", help="write the generated range as a .sched state")
+
+    rotation = sub.add_parser("rotation", help="backwards weekly rotation")
+    rotation.add_argument("--initial-week", required=True, help="file with the doctors for Monday..Sunday of the first week")
+    rotation.add_argument("--start", required=True, type=parse_date, help="Monday of the initial week, YYYY-MM-DD")
+    rotation.add_argument("--end", required=True, type=parse_date, help="last day, YYYY-MM-DD")
+
+    for p in (shifts, rotation):
+        p.add_argument("--format", choices=["csv", "jsonl"], default="csv")
+        p.add_argument("-o", "--output", help="output file (default: stdout)")
+        p.add_argument("-q", "--quiet", action="store_true", help="do not print timing")
+    return parser
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    stream, close = open_output(args.output)
+    started = time.perf_counter()
+    try:
+        writer = RowWriter(stream, args.format)
+        run = run_shifts if args.command == "shifts" else run_rotation
+        n_months = run(args, writer)
+    except InputError as e:
+        parser.exit(2, f"{parser.prog}: error: {e}\n")
+    except BrokenPipeError:
+        # Downstream reader (e.g. head) went away; stop quietly. stdout is
+        # pointed at devnull so the interpreter's final flush cannot fail too
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        return 1
+    finally:
+        if close:
+            stream.close()
+    if not args.quiet:
+        print(f"{args.command}: {writer.rows} days in {n_months} months, {time.perf_counter() - started:.3f}s",
+              file=sys.stderr)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,73 @@
+# Bitset constraint checks
+#
+# Each doctor's assignments are kept as an int bitmask over day indices, one
+# mask for all assigned days and one for weekend days. The 2-day gap and the
+# weekend-spacing rules then become a shift and an AND instead of timedelta
+# arithmetic and dict lookups on date keys. Indices start a margin before the
+# origin so the window around the first day never needs a negative shift.
+# Used by the greedy solver and the incremental re-solve, and usable by any
+# search that places and removes assignments.
+
+from .rules import GAP, WEEKEND_SPACING
+
+
+class ConstraintChecker:
+    def __init__(self, origin, gap=GAP, weekend_spacing=WEEKEND_SPACING):
+        self.gap = gap
+        self.spacing = weekend_spacing
+        self.origin = origin.toordinal() - max(gap, weekend_spacing)
+        self.days = {}
+        self.weekends = {}
+        # doc -> bitmask of days the doctor is on leave or otherwise unavailable
+        self.blocked = {}
+        # bits i-gap..i+gap except i itself
+        self._gap_mask = ((1 << (2*gap + 1)) - 1) ^ (1 << gap)
+        # bits i-spacing..i-1, and i-spacing..i+spacing except i
+        self._before_mask = (1 << weekend_spacing) - 1
+        self._around_mask = ((1 << (2*weekend_spacing + 1)) - 1) ^ (1 << weekend_spacing)
+
+    def index(self, d):
+        return d.toordinal() - self.origin
+
+    def place(self, doc, i, weekend=False):
+        bit = 1 << i
+        self.days[doc] = self.days.get(doc, 0) | bit
+        if weekend:
+            self.weekends[doc] = self.weekends.get(doc, 0) | bit
+
+    def remove(self, doc, i, weekend=False):
+        bit = 1 << i
+        self.days[doc] = self.days.get(doc, 0) & ~bit
+        if weekend:
+            self.weekends[doc] = self.weekends.get(doc, 0) & ~bit
+
+    def load(self, assign_map, weekend_days=()):
+        weekend_days = set(weekend_days)
+        for d, doc in assign_map.items():
+            self.place(doc, self.index(d), d in weekend_days)
+
+    def load_availability(self, availability, doctors, n_days):
+        # n_days: indices 0..n_days-1 to cover
+        for doc in doctors:
+            bits = availability.blocked_bits(doc, self.origin, n_days)
+            if bits:
+                self.blocked[doc] = bits
+
+    def available(self, doc, i):
+        return not (self.blocked.get(doc, 0) >> i) & 1
+
+    def gap_free(self, doc, i):
+        return not (self.days.get(doc, 0) >> (i - self.gap)) & self._gap_mask
+
+    def spacing_free(self, doc, i, both_sides=False):
+        # Weekend days already taken by doc within the spacing horizon; the
+        # greedy pass fills weekends in date order, so it only looks back
+        bits = self.weekends.get(doc, 0) >> (i - self.spacing)
+        return not bits & (self._around_mask if both_sides else self._before_mask)
+
+    def can_assign(self, doc, i, weekend=False, both_sides=False):
+        if self.blocked and (self.blocked.get(doc, 0) >> i) & 1:
+            return False
+        if (self.days.get(doc, 0) >> (i - self.gap)) & self._gap_mask:
+            return False
+        return not weekend or self.spacing_free(doc, i, both_sides)
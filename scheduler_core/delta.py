@@ -0,0 +1,125 @@
+# Incremental re-solve of a generated month
+#
+# Instead of regenerating a whole month when a few days change (e.g. holidays
+# toggled in the UI), only the window that the changed days can influence is
+# cleared and re-assigned: the changed days, their gap neighbours, and the
+# weekend days within the weekend-spacing horizon of those. Everything outside
+# the window stays fixed and acts as a constraint. If the window cannot be
+# filled without forcing a day past the rules, the whole month is re-solved
+# instead, so a re-solve never breaks more rules than a full solve would.
+
+from collections import defaultdict, deque, namedtuple
+from datetime import timedelta
+
+from .doctor_queue import DoctorQueue
+from .calendar_index import categorize_dates
+from .constraints import ConstraintChecker
+from .rules import GAP, WEEKEND_SPACING
+from .solver import assign_shifts, fair_share, ranked_pass, cycle_pass
+
+CellChange = namedtuple("CellChange", ["date", "old", "new"])
+
+# ---------------------------
+# Window
+
+def affected_window(dates, changed_days):
+    in_range = set(dates)
+    window = set()
+    for d in changed_days:
+        for delta in range(-GAP, GAP+1):
+            nd = d + timedelta(days=delta)
+            if nd in in_range:
+                window.add(nd)
+    # weekend days are also constrained by weekend spacing
+    for d in [d for d in window if d.weekday() >= 5]:
+        for delta in range(-WEEKEND_SPACING, WEEKEND_SPACING+1):
+            nd = d + timedelta(days=delta)
+            if nd in in_range and nd.weekday() >= 5:
+                window.add(nd)
+    return window
+
+def roll_back(assign_map, days, weekend_set, weekend_history, friday_history):
+    # Take the given days' assignments back out of the histories
+    for d in days:
+        doc = assign_map.get(d)
+        if doc is None:
+            continue
+        if d in weekend_set:
+            weekend_history[doc] -= 1
+        elif d.weekday() == 4:
+            friday_history[doc] -= 1
+
+# ---------------------------
+# Re-solve
+
+def resolve_changed_days(assign_map, dates, doctors, changed_days, weekend_history=None, friday_history=None,
+                         availability=None):
+    if weekend_history is None:
+        weekend_history = defaultdict(int)
+    if friday_history is None:
+        friday_history = defaultdict(int)
+
+    window = affected_window(dates, changed_days)
+    old_map = assign_map
+    assign_map = {d: doc for d, doc in old_map.items() if d not in window}
+
+    weekdays, fridays, saturdays, sundays = categorize_dates(dates)
+    weekend_set = set(saturdays + sundays)
+    roll_back(old_map, window, weekend_set, weekend_history, friday_history)
+
+    # Fixed days constrain the window from both sides, so weekend spacing is
+    # checked in both directions
+    checker = ConstraintChecker(min(list(dates) + list(assign_map)))
+    checker.load(assign_map, weekend_set)
+    if availability and dates:
+        checker.load_availability(availability, doctors, checker.index(max(dates)) + 1)
+
+    def can_assign(doc, di, is_weekend=False):
+        return checker.can_assign(doc, di, is_weekend, both_sides=True)
+
+    def seeded_counts(days):
+        counts = defaultdict(int)
+        for d in days:
+            if d in assign_map:
+                counts[assign_map[d]] += 1
+        return counts
+
+    # Step 1: Weekends
+    weekend_days = sorted(weekend_set)
+    weekend_assign_counts = seeded_counts(weekend_days)
+    share = fair_share(len(weekend_days), doctors, weekend_assign_counts)
+    queue = DoctorQueue(doctors, key=lambda doc: (weekend_history[doc], weekend_assign_counts[doc]))
+    forced = ranked_pass([d for d in weekend_days if d in window], doctors, assign_map, checker, can_assign, queue,
+                         weekend_assign_counts, weekend_history, share, True)
+
+    # Step 2: Fridays
+    friday_assign_counts = seeded_counts(fridays)
+    share = fair_share(len(fridays), doctors, friday_assign_counts)
+    queue = DoctorQueue(doctors, key=lambda doc: (weekend_assign_counts[doc], friday_history[doc]))
+    forced += ranked_pass([d for d in fridays if d in window], doctors, assign_map, checker, can_assign, queue,
+                          friday_assign_counts, friday_history, share)
+
+    # Step 3: Weekdays, each run of window days continuing the rotation from
+    # the fixed weekday before it
+    weekday_cycle = deque(doctors)
+    run = []
+    for d in weekdays + [None]:
+        if d in window:
+            run.append(d)
+            continue
+        forced += cycle_pass(run, assign_map, checker, can_assign, weekday_cycle)
+        run = []
+        if assign_map.get(d) in doctors:
+            weekday_cycle = deque(doctors)
+            weekday_cycle.rotate(-(doctors.index(assign_map[d]) + 1))
+
+    if forced:
+        # The fixed neighbours left no valid pick: solve the month afresh
+        roll_back(assign_map, dates, weekend_set, weekend_history, friday_history)
+        assign_map = assign_shifts(dates, doctors, weekend_history=weekend_history, friday_history=friday_history,
+                                   availability=availability)
+
+    changed = set(changed_days)
+    cells = [CellChange(d, old_map.get(d), assign_map.get(d)) for d in dates
+             if d in changed or old_map.get(d) != assign_map.get(d)]
+    return assign_map, cells
@@ -0,0 +1,77 @@
+# Indexed min-heap of doctors keyed on a fairness tuple
+#
+# Replaces re-sorting the whole doctor list for every weekend day and Friday.
+# Entries are (key, position) so ties fall back to the doctor's position in
+# the input list, which is the same order a stable sorted() gives. After a
+# doctor's counters change, update() restores the heap in O(log n).
+
+import heapq
+
+
+class DoctorQueue:
+    def __init__(self, doctors, key):
+        self.doctors = list(doctors)
+        self.key = key
+        self.heap = [(key(doc), i) for i, doc in enumerate(self.doctors)]
+        heapq.heapify(self.heap)
+        self.pos = [0]*len(self.heap)
+        for slot, (_, i) in enumerate(self.heap):
+            self.pos[i] = slot
+
+    def __len__(self):
+        return len(self.heap)
+
+    def first(self):
+        return self.heap[0][1]
+
+    def ordered(self):
+        # Yield doctor positions in key order without popping: walk the heap
+        # tree best-first, so inspecting k candidates costs O(k log k)
+        if not self.heap:
+            return
+        frontier = [(self.heap[0], 0)]
+        while frontier:
+            (_, i), slot = heapq.heappop(frontier)
+            yield i
+            for child in (2*slot + 1, 2*slot + 2):
+                if child < len(self.heap):
+                    heapq.heappush(frontier, (self.heap[child], child))
+
+    def update(self, i):
+        slot = self.pos[i]
+        old = self.heap[slot]
+        self.heap[slot] = (self.key(self.doctors[i]), i)
+        if self.heap[slot] < old:
+            self._sift_up(slot)
+        else:
+            self._sift_down(slot)
+
+    # ---------------------------
+    # Heap maintenance
+
+    def _swap(self, a, b):
+        heap = self.heap
+        heap[a], heap[b] = heap[b], heap[a]
+        self.pos[heap[a][1]] = a
+        self.pos[heap[b][1]] = b
+
+    def _sift_up(self, slot):
+        while slot > 0:
+            parent = (slot - 1) // 2
+            if self.heap[slot] < self.heap[parent]:
+                self._swap(slot, parent)
+                slot = parent
+            else:
+                break
+
+    def _sift_down(self, slot):
+        n = len(self.heap)
+        while True:
+            best = slot
+            for child in (2*slot + 1, 2*slot + 2):
+                if child < n and self.heap[child] < self.heap[best]:
+                    best = child
+            if best == slot:
+                break
+            self._swap(slot, best)
+            slot = best
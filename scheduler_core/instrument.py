@@ -0,0 +1,133 @@
+# Opt-in instrumentation
+#
+# Phase timers and event counters for the solver, the renderers and the app
+# actions that drive them. Nothing is recorded until a sink is enabled:
+# start() then returns None, so the only cost left in the hot paths is an
+# `if rec:` test per phase. When enabled, each run produces one record
+#
+#   {"name": ..., "elapsed": seconds, "timers": {phase: seconds}, "counters": {event: n}}
+#
+# which is handed to the sink. It can also be switched on without code
+# changes through the SCHEDULER_INSTRUMENT environment variable:
+# "log", "json" (stderr) or "json:<path>".
+
+import os
+import sys
+import time
+from collections import defaultdict
+
+# ---------------------------
+# Recording
+
+class Recorder:
+    def __init__(self, name):
+        self.name = name
+        self.timers = defaultdict(float)
+        self.counters = defaultdict(int)
+        self.started = self._last = time.perf_counter()
+
+    def count(self, key, n=1):
+        self.counters[key] += n
+
+    def lap(self, key):
+        # Time since the previous lap (or the start) is added to timer key
+        now = time.perf_counter()
+        self.timers[key] += now - self._last
+        self._last = now
+
+    def counting(self, key, fn):
+        # fn wrapped so every call is counted under key
+        counters = self.counters
+
+        def wrapper(*args, **kwargs):
+            counters[key] += 1
+            return fn(*args, **kwargs)
+        return wrapper
+
+    def record(self):
+        return {"name": self.name, "elapsed": time.perf_counter() - self.started,
+                "timers": dict(self.timers), "counters": dict(self.counters)}
+
+# ---------------------------
+# Sinks
+
+class MemorySink:
+    def __init__(self):
+        self.records = []
+
+    def emit(self, record):
+        self.records.append(record)
+
+    def clear(self):
+        self.records.clear()
+
+
+class LogSink:
+    # logging and json are only imported once a sink that needs them is made
+    def __init__(self, logger=None, level=None):
+        import logging
+        self.logger = logger or logging.getLogger("scheduler_core.instrument")
+        self.level = logging.INFO if level is None else level
+
+    def emit(self, record):
+        phases = " ".join(f"{k}={v*1000:.3f}ms" for k, v in record["timers"].items())
+        counts = " ".join(f"{k}={v}" for k, v in record["counters"].items())
+        self.logger.log(self.level, "%s %.3fms %s %s", record["name"], record["elapsed"]*1000, phases, counts)
+
+
+class JSONSink:
+    # One JSON object per line, to a writable stream or appended to a path
+    def __init__(self, out=None):
+        import json
+        self.dumps = json.dumps
+        self.out = sys.stderr if out is None else out
+
+    def emit(self, record):
+        line = self.dumps(record) + "\n"
+        if isinstance(self.out, (str, os.PathLike)):
+            with open(self.out, "a", encoding="utf-8") as f:
+                f.write(line)
+        else:
+            self.out.write(line)
+
+# ---------------------------
+# Switch
+
+_sink = None
+
+def enable(sink):
+    global _sink
+    _sink = sink
+    return sink
+
+def disable():
+    global _sink
+    _sink = None
+
+def enabled():
+    return _sink is not None
+
+def start(name):
+    # A Recorder while a sink is enabled, otherwise None
+    return Recorder(name) if _sink is not None else None
+
+def finish(rec):
+    if rec is not None and _sink is not None:
+        _sink.emit(rec.record())
+
+def enable_from_env(var="SCHEDULER_INSTRUMENT"):
+    value = os.environ.get(var, "")
+    if value == "log":
+        import logging
+        logger = logging.getLogger("scheduler_core.instrument")
+        if not logger.handlers:
+            logger.addHandler(logging.StreamHandler())
+            logger.setLevel(logging.INFO)
+        enable(LogSink(logger))
+    elif value == "json":
+        enable(JSONSink())
+    elif value.startswith("json:"):
+        enable(JSONSink(value[len("json:"):]))
+
+if os.environ.get("SCHEDULER_INSTRUMENT"):
+    enable_from_env()
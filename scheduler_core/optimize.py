@@ -0,0 +1,247 @@
+# Bounded local search on top of the greedy solver
+#
+# When no doctor passes the constraints, the greedy passes fall back to the
+# best-ranked doctor and break the 2-day gap. optimize_schedule starts from a
+# finished schedule and repeatedly tries two kinds of changes:
+#   move - give one day to a different doctor
+#   swap - exchange the doctors of two days of the same weekday class
+# Each change is scored incrementally from the days around it. Changes that do
+# not make the schedule worse are always kept; early in the budget a worse
+# change may be kept too (simulated annealing), so the search can climb out of
+# a local optimum where every single move would add a violation. The best
+# schedule seen is returned once the time budget or iteration limit runs out.
+# Without either bound it is a plain descent that stops when it stalls.
+# Changes that would put a doctor on a day they are unavailable (leave,
+# weekday limits) are never tried.
+
+import math
+import random
+import time
+from collections import defaultdict, namedtuple
+
+from . import instrument
+from .solver import assign_shifts
+from .rules import GAP, WEEKEND_SPACING
+
+OptimizeResult = namedtuple("OptimizeResult", ["assignments", "cost", "initial_cost", "iterations", "elapsed"])
+
+# Cost weights: hard rules dominate balance terms
+GAP_WEIGHT = 1000
+SPACING_WEIGHT = 1000
+# Starting annealing temperature, cooled linearly to zero over the budget
+START_TEMPERATURE = GAP_WEIGHT / 2
+
+# Balance terms: sum of squared per-doctor counts within each term
+FRI, SAT, SUN, WEEKEND, WEEKDAY = range(5)
+
+
+def _terms(d):
+    wd = d.weekday()
+    if wd == 4:
+        return (FRI,)
+    if wd == 5:
+        return (SAT, WEEKEND)
+    if wd == 6:
+        return (SUN, WEEKEND)
+    return (WEEKDAY,)
+
+# ---------------------------
+# Search state
+
+class _Search:
+    def __init__(self, assign_map, doctors, weekend_history, friday_history, availability=None,
+                 gap=GAP, weekend_spacing=WEEKEND_SPACING):
+        self.doctors = list(doctors)
+        idx = {doc: i for i, doc in enumerate(self.doctors)}
+        self.days = sorted(assign_map)
+        self.doc_of = [idx[assign_map[d]] for d in self.days]
+        self.ordinal = [d.toordinal() for d in self.days]
+        self.at = {o: i for i, o in enumerate(self.ordinal)}
+        self.weekend = [d.weekday() >= 5 for d in self.days]
+        self.terms = [_terms(d) for d in self.days]
+        # per day, the doctor indices who cannot work it
+        self.blocked = None
+        if availability:
+            self.blocked = [frozenset(k for k, doc in enumerate(self.doctors) if not availability.is_available(doc, d))
+                            for d in self.days]
+
+        n = len(self.doctors)
+        self.counts = [[0]*n for _ in range(5)]
+        for doc, c in (weekend_history or {}).items():
+            if doc in idx:
+                self.counts[WEEKEND][idx[doc]] += c
+        for doc, c in (friday_history or {}).items():
+            if doc in idx:
+                self.counts[FRI][idx[doc]] += c
+        for i, k in enumerate(self.doc_of):
+            for t in self.terms[i]:
+                self.counts[t][k] += 1
+
+        # Neighbour day indices for the gap and weekend-spacing rules
+        self.gap_nb = [self._around(i, gap) for i in range(len(self.days))]
+        self.spacing_nb = [[j for j in self._around(i, weekend_spacing) if self.weekend[j]] if self.weekend[i] else []
+                           for i in range(len(self.days))]
+        self.by_term = defaultdict(list)
+        for i, terms in enumerate(self.terms):
+            self.by_term[terms[0]].append(i)
+
+    def _around(self, i, reach):
+        o = self.ordinal[i]
+        return [self.at[o + delta] for delta in range(-reach, reach+1) if delta and (o + delta) in self.at]
+
+    def allowed(self, i, k):
+        return self.blocked is None or k not in self.blocked[i]
+
+    def cost(self):
+        total = 0
+        for i, k in enumerate(self.doc_of):
+            total += GAP_WEIGHT * sum(1 for j in self.gap_nb[i] if j > i and self.doc_of[j] == k)
+            total += SPACING_WEIGHT * sum(1 for j in self.spacing_nb[i] if j > i and self.doc_of[j] == k)
+        for counts in self.counts:
+            total += sum(c*c for c in counts)
+        return total
+
+    def move_delta(self, i, new):
+        old = self.doc_of[i]
+        if old == new:
+            return 0
+        delta = 0
+        for j in self.gap_nb[i]:
+            k = self.doc_of[j]
+            delta += GAP_WEIGHT * ((k == new) - (k == old))
+        for j in self.spacing_nb[i]:
+            k = self.doc_of[j]
+            delta += SPACING_WEIGHT * ((k == new) - (k == old))
+        for t in self.terms[i]:
+            counts = self.counts[t]
+            delta += 2*(counts[new] - counts[old]) + 2
+        return delta
+
+    def apply(self, i, new):
+        old = self.doc_of[i]
+        for t in self.terms[i]:
+            self.counts[t][old] -= 1
+            self.counts[t][new] += 1
+        self.doc_of[i] = new
+
+    def assignments(self):
+        return {d: self.doctors[k] for d, k in zip(self.days, self.doc_of)}
+
+# ---------------------------
+# Optimizer
+
+def optimize_schedule(assign_map, doctors, weekend_history=None, friday_history=None,
+                      time_budget=0.25, max_iterations=None, seed=None, availability=None,
+                      gap=GAP, weekend_spacing=WEEKEND_SPACING):
+    started = time.perf_counter()
+    if not assign_map or len(doctors) < 2:
+        return OptimizeResult(dict(assign_map), 0, 0, 0, 0.0)
+
+    rng = random.Random(seed)
+    search = _Search(assign_map, doctors, weekend_history, friday_history, availability, gap, weekend_spacing)
+    cost = initial_cost = search.cost()
+    best_cost, best = cost, list(search.doc_of)
+    n_days, n_docs = len(search.days), len(search.doctors)
+    bounded = time_budget is not None or max_iterations is not None
+    stall_limit = max(200, 4*n_days*n_docs)
+    temperature = START_TEMPERATURE if bounded else 0
+
+    def accept(delta):
+        if delta <= 0:
+            return True
+        return temperature > 0 and rng.random() < math.exp(-delta / temperature)
+
+    iterations = stall = 0
+    while bounded or stall < stall_limit:
+        if max_iterations is not None and iterations >= max_iterations:
+            break
+        if iterations % 64 == 0 and bounded:
+            # Cool down with whichever bound is closer to running out
+            progress = 0.0
+            if time_budget is not None:
+                progress = (time.perf_counter() - started) / time_budget if time_budget > 0 else 1.0
+            if max_iterations is not None:
+                progress = max(progress, iterations / max_iterations)
+            if progress >= 1.0:
+                break
+            temperature = START_TEMPERATURE * (1.0 - progress)
+        iterations += 1
+
+        i = rng.randrange(n_days)
+        if rng.random() < 0.5:
+            new = rng.randrange(n_docs - 1)
+            if new >= search.doc_of[i]:
+                new += 1
+            if not search.allowed(i, new):
+                stall += 1
+                continue
+            delta = search.move_delta(i, new)
+            if accept(delta):
+                search.apply(i, new)
+            else:
+                delta = 0
+        else:
+            peers = search.by_term[search.terms[i][0]]
+            j = peers[rng.randrange(len(peers))]
+            a, b = search.doc_of[i], search.doc_of[j]
+            if a == b or not (search.allowed(i, b) and search.allowed(j, a)):
+                stall += 1
+                continue
+            delta = search.move_delta(i, b)
+            search.apply(i, b)
+            delta += search.move_delta(j, a)
+            if accept(delta):
+                search.apply(j, a)
+            else:
+                search.apply(i, a)
+                delta = 0
+
+        cost += delta
+        if cost < best_cost:
+            best_cost, best = cost, list(search.doc_of)
+            stall = 0
+        else:
+            stall += 1
+
+    search.doc_of = best
+    return OptimizeResult(search.assignments(), best_cost, initial_cost, iterations, time.perf_counter() - started)
+
+
+def assign_shifts_optimized(dates, doctors, prev_assignments=None, weekend_history=None, friday_history=None,
+                            holidays=None, time_budget=0.25, max_iterations=None, seed=None, availability=None,
+                            gap=GAP, weekend_spacing=WEEKEND_SPACING):
+    # Drop-in solver: greedy solve, then local search, returning the
+    # assign_map like the other engines. The histories end up reflecting the
+    # optimized schedule rather than the greedy one. Search statistics are
+    # recorded through instrument; call optimize_schedule directly to get
+    # them as an OptimizeResult.
+    rec = instrument.start("assign_shifts_optimized")
+    if weekend_history is None:
+        weekend_history = defaultdict(int)
+    if friday_history is None:
+        friday_history = defaultdict(int)
+    before_weekend, before_friday = dict(weekend_history), dict(friday_history)
+    greedy = assign_shifts(dates, doctors, prev_assignments, weekend_history, friday_history, holidays,
+                           availability=availability, gap=gap, weekend_spacing=weekend_spacing)
+    if rec:
+        rec.lap("greedy")
+    result = optimize_schedule(greedy, doctors, before_weekend, before_friday,
+                               time_budget=time_budget, max_iterations=max_iterations, seed=seed,
+                               availability=availability, gap=gap, weekend_spacing=weekend_spacing)
+    for d in greedy:
+        old, new = greedy[d], result.assignments[d]
+        if old == new:
+            continue
+        if d.weekday() >= 5:
+            weekend_history[old] -= 1
+            weekend_history[new] += 1
+        elif d.weekday() == 4:
+            friday_history[old] -= 1
+            friday_history[new] += 1
+    if rec:
+        rec.lap("search")
+        rec.count("iterations", result.iterations)
+        rec.count("initial_cost", result.initial_cost)
+        rec.count("cost", result.cost)
+        instrument.finish(rec)
+    return result.assignments
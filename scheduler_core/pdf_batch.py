@@ -0,0 +1,62 @@
+# Multi-roster PDF export
+#
+# Renders one PDF per department (or per department and month) in a process
+# pool and collects them into a single zip archive. Each worker configures
+# the bundled Unicode font once when it starts, so Greek doctor names render
+# and the TTF is not re-parsed for every document.
+
+import io
+import zipfile
+from collections import defaultdict, namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+from .pdf_export import UNICODE_FONT, configure_fonts, export_pdf, page_template
+
+RosterJob = namedtuple("RosterJob", ["filename", "schedule", "colors"])
+
+# ---------------------------
+# Jobs
+
+def roster_jobs(rosters, colors=None, per_month=False):
+    # rosters: {department: {date: doctor}}; colors: {doctor: rgb} for all
+    colors = colors or {}
+    jobs = []
+    for name, schedule in rosters.items():
+        if not per_month:
+            jobs.append(RosterJob(f"{name}.pdf", schedule, colors))
+            continue
+        parts = defaultdict(dict)
+        for d, doc in schedule.items():
+            parts[(d.year, d.month)][d] = doc
+        for year, month in sorted(parts):
+            jobs.append(RosterJob(f"{name}-{year:04d}-{month:02d}.pdf", parts[(year, month)], colors))
+    return jobs
+
+def _init_worker():
+    configure_fonts()
+
+def render_job(job):
+    buf = io.BytesIO()
+    export_pdf(job.schedule, buf, colors=job.colors, template=page_template(font=UNICODE_FONT))
+    return job.filename, buf.getvalue()
+
+# ---------------------------
+# Export
+
+def export_rosters(rosters, out, colors=None, per_month=False, max_workers=None):
+    # out: path or writable file-like object for the zip archive
+    jobs = roster_jobs(rosters, colors, per_month)
+    if max_workers == 1:
+        _init_worker()
+        rendered = map(render_job, jobs)
+        write_zip(out, rendered)
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker) as pool:
+            write_zip(out, pool.map(render_job, jobs))
+    return out
+
+def write_zip(out, rendered):
+    # Write each PDF as soon as its worker finishes (pool.map keeps order)
+    with zipfile.ZipFile(out, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+        for filename, data in rendered:
+            zf.writestr(filename, data)
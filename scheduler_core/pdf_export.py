@@ -0,0 +1,167 @@
+# Calendar PDF export
+#
+# One landscape page per month with a weekday header row and a week grid of
+# doctor-coloured cells. The page geometry and week grids are computed once
+# and cached, pages are rendered month by month straight from the schedule
+# (no sort over every date), and the finished document can go to a path or
+# any writable file-like object.
+
+import os
+from collections import namedtuple
+from datetime import date
+from functools import lru_cache
+
+from . import instrument
+from .calendar_index import month_index
+
+WEEKDAY_LABELS = ["Mon","Tue","Wed","Thu","Fri","Sat","Sun"]
+DEFAULT_COLOR = (220,220,220)
+OUTSIDE_COLOR = (240,240,240)
+
+# Bundled TrueType font with Greek coverage; core fonts such as Arial are
+# Latin-1 only
+UNICODE_FONT = "DejaVu"
+UNICODE_FONT_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "DejaVuSans.ttf")
+
+PageTemplate = namedtuple("PageTemplate", ["orientation", "page_format", "font", "col_width",
+                                           "title_height", "header_height", "cell_height"])
+
+
+def get_text_color(rgb):
+    r, g, b = rgb
+    brightness = (r*299 + g*587 + b*114)/1000
+    return (0,0,0) if brightness > 125 else (255,255,255)
+
+# ---------------------------
+# Fonts
+
+_font_template = None
+
+def configure_fonts():
+    # Once per process: parse the bundled font into a template document kept
+    # in memory. fpdf 1.x would otherwise cache the parsed metrics as a pickle
+    # on disk and unpickle it for every later document, so its disk cache is
+    # switched off and new documents copy the template's font entries.
+    global _font_template
+    if _font_template is None:
+        import fpdf
+        if hasattr(fpdf, "set_global"):
+            fpdf.set_global("FPDF_CACHE_MODE", 1)
+        template = fpdf.FPDF()
+        _add_unicode_font(template)
+        _font_template = template
+    return _font_template
+
+def _add_unicode_font(pdf):
+    # The bundled font has no bold face; headings reuse the regular one
+    for style in ("", "B"):
+        pdf.add_font(UNICODE_FONT, style, UNICODE_FONT_PATH, uni=True)
+
+def register_unicode_font(pdf):
+    import fpdf
+    if not hasattr(fpdf, "set_global"):
+        # fpdf2 keeps no metrics cache of its own
+        _add_unicode_font(pdf)
+        return
+    template = configure_fonts()
+    for style in ("", "B"):
+        key = UNICODE_FONT.lower() + style
+        if key in pdf.fonts:
+            continue
+        # Per-document fields are fresh copies; the glyph widths are shared
+        font = dict(template.fonts[key])
+        font["i"] = len(pdf.fonts) + 1
+        font["subset"] = list(font["subset"])
+        pdf.fonts[key] = font
+        pdf.font_files[key] = dict(template.font_files[key])
+    pdf.font_files[UNICODE_FONT_PATH] = dict(template.font_files[UNICODE_FONT_PATH])
+
+# ---------------------------
+# Cached layout
+
+@lru_cache(maxsize=None)
+def page_template(orientation="L", page_format="A4", font="Arial"):
+    from fpdf import FPDF
+    probe = FPDF(orientation=orientation, unit="mm", format=page_format)
+    return PageTemplate(orientation, page_format, font, probe.w / 7 - 5, 10, 8, 20)
+
+def month_weeks(year, month):
+    # Week rows of day numbers, 0 for days that belong to a neighbouring month
+    return month_index(year, month).weeks
+
+def schedule_months(schedule):
+    return sorted({(d.year, d.month) for d in schedule})
+
+# ---------------------------
+# Rendering
+
+def draw_month(pdf, tpl, ym, schedule, colors):
+    year, month = ym
+    pdf.add_page()
+    pdf.set_font(tpl.font, "B", 16)
+    pdf.cell(0, tpl.title_height, date(year, month, 1).strftime("%B %Y"), ln=True, align="C")
+    pdf.ln(3)
+
+    pdf.set_font(tpl.font, "B", 12)
+    for label in WEEKDAY_LABELS:
+        pdf.cell(tpl.col_width, tpl.header_height, label, border=1, align='C')
+    pdf.ln()
+    pdf.set_font(tpl.font, "", 12)
+
+    for week in month_weeks(year, month):
+        for day in week:
+            if day:
+                doc = schedule.get(date(year, month, day), "")
+                color = colors.get(doc, DEFAULT_COLOR)
+                pdf.set_fill_color(*color)
+                pdf.set_text_color(*get_text_color(color))
+                pdf.cell(tpl.col_width, tpl.cell_height, f"{day}\n{doc}", border=1, ln=0, align='C', fill=True)
+            else:
+                pdf.set_fill_color(*OUTSIDE_COLOR)
+                pdf.cell(tpl.col_width, tpl.cell_height, "", border=1, ln=0)
+        pdf.ln()
+
+def iter_pages(pdf, schedule, colors, template=None):
+    # Render month pages one at a time, yielding each month once it is drawn
+    template = template or page_template()
+    for ym in schedule_months(schedule):
+        draw_month(pdf, template, ym, schedule, colors)
+        yield ym
+
+def new_document(template=None):
+    from fpdf import FPDF
+    template = template or page_template()
+    pdf = FPDF(orientation=template.orientation, unit="mm", format=template.page_format)
+    if template.font == UNICODE_FONT:
+        register_unicode_font(pdf)
+    pdf.set_auto_page_break(auto=True, margin=15)
+    pdf.set_font(template.font, "", 12)
+    return pdf
+
+def document_bytes(pdf):
+    data = pdf.output(dest="S")
+    # fpdf 1.x returns a latin-1 str, fpdf2 a bytearray
+    return data.encode("latin-1") if isinstance(data, str) else bytes(data)
+
+def export_pdf(schedule, out, colors=None, template=None, on_page=None):
+    colors = colors or {}
+    rec = instrument.start("export_pdf")
+    pdf = new_document(template)
+    for ym in iter_pages(pdf, schedule, colors, template):
+        if on_page is not None:
+            on_page(ym)
+        if rec:
+            rec.count("pages")
+    if rec:
+        rec.lap("render")
+    data = document_bytes(pdf)
+    if isinstance(out, (str, os.PathLike)):
+        with open(out, "wb") as f:
+            f.write(data)
+    else:
+        out.write(data)
+    if rec:
+        rec.lap("export")
+        rec.count("bytes", len(data))
+        instrument.finish(rec)
+    return out
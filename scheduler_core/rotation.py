@@ -0,0 +1,107 @@
+# Backwards weekly rotation used by the Streamlit rotation planner
+#
+# The first week is taken as given. Every following week each doctor moves two
+# days earlier, wrapping within the week: (wd - 2) % 7. Because that shift is
+# periodic, week k uses the same layout as week k % 7, so the doctor on any
+# date follows directly from the initial week and the date's offset from the
+# start. The whole rotation therefore repeats every 7 weeks.
+
+import datetime
+
+from .balance import WEEKEND_CLASSES
+
+ROTATION_SHIFT = 2
+DAYS_PER_WEEK = 7
+PERIOD_WEEKS = 7
+
+
+class Rotation:
+    def __init__(self, initial_week, start_date):
+        self.initial_week = list(initial_week)
+        self.start_date = start_date
+        # Last position wins for a doctor listed twice, as in the weekly loop
+        doctor_to_weekday = {doc: i for i, doc in enumerate(self.initial_week)}
+        # layouts[r][w]: doctor on day w of any week k >= 1 with k % 7 == r
+        self.layouts = []
+        for r in range(PERIOD_WEEKS):
+            layout = [None]*DAYS_PER_WEEK
+            for doc, wd in doctor_to_weekday.items():
+                layout[(wd - ROTATION_SHIFT*r) % DAYS_PER_WEEK] = doc
+            self.layouts.append(layout)
+
+    def doctor_on(self, day, end_date=None):
+        offset = (day - self.start_date).days
+        if offset < 0:
+            return None
+        week, wd = divmod(offset, DAYS_PER_WEEK)
+        if week >= 1 and (end_date is None or day <= end_date):
+            doc = self.layouts[week % PERIOD_WEEKS][wd]
+            if doc is not None:
+                return doc
+        if offset < len(self.initial_week):
+            return self.initial_week[offset]
+        return None
+
+    def iter_range(self, first, last):
+        # (date, doctor) for every rostered day in [first, last]
+        ordinal = max(first, self.start_date).toordinal()
+        start = self.start_date.toordinal()
+        for o in range(ordinal, last.toordinal() + 1):
+            week, wd = divmod(o - start, DAYS_PER_WEEK)
+            doc = self.layouts[week % PERIOD_WEEKS][wd] if week >= 1 else None
+            if doc is None and o - start < len(self.initial_week):
+                doc = self.initial_week[o - start]
+            if doc is not None:
+                yield datetime.date.fromordinal(o), doc
+
+    def _layout_doctor(self, offset):
+        week, wd = divmod(offset, DAYS_PER_WEEK)
+        return self.layouts[week % PERIOD_WEEKS][wd]
+
+    def balance(self, end_date, doctors):
+        # Fri/Sat/Sun counts per doctor for generate_schedule(initial_week,
+        # start_date, end_date), without building the schedule: the head of
+        # the range (where the initial week still shows through) is counted
+        # day by day, the rest as whole 49-day periods plus a remainder
+        counts = {doc: {"Friday":0, "Saturday":0, "Sunday":0} for doc in doctors}
+
+        def add(doc, offset, times=1):
+            day_class = WEEKEND_CLASSES.get((first_wd + offset) % DAYS_PER_WEEK)
+            if doc is not None and day_class:
+                counts.setdefault(doc, {"Friday":0, "Saturday":0, "Sunday":0})[day_class] += times
+
+        first_wd = self.start_date.weekday()
+        last = (end_date - self.start_date).days
+        head = max(len(self.initial_week), DAYS_PER_WEEK)
+        for offset in range(head):
+            if offset <= last or offset < len(self.initial_week):
+                add(self.doctor_on(self.start_date + datetime.timedelta(days=offset), end_date), offset)
+
+        if last >= head:
+            period = PERIOD_WEEKS * DAYS_PER_WEEK
+            full, rest = divmod(last - head + 1, period)
+            if full:
+                for offset in range(head, head + period):
+                    add(self._layout_doctor(offset), offset, full)
+            for offset in range(head + full*period, last + 1):
+                add(self._layout_doctor(offset), offset)
+        return counts
+
+
+# ----------------------------
+# SCHEDULE GENERATION
+# ----------------------------
+def generate_schedule(initial_week, start_date, end_date):
+    rotation = Rotation(initial_week, start_date)
+    schedule = dict(rotation.iter_range(start_date, end_date))
+
+    # Preserve initial week, even where it runs past end_date
+    for i, doc in enumerate(initial_week):
+        day = start_date + datetime.timedelta(days=i)
+        if day not in schedule:
+            schedule[day] = doc
+
+    return schedule
+
+def rotation_balance(initial_week, start_date, end_date, doctors):
+    return Rotation(initial_week, start_date).balance(end_date, doctors)
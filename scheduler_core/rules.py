@@ -0,0 +1,6 @@
+# Scheduling rules shared by the solvers, the optimizer and the checkers
+
+# Days on each side of an assignment that the same doctor may not work
+GAP = 2
+# A doctor may not take two weekend days within this many days
+WEEKEND_SPACING = 7
@@ -0,0 +1,55 @@
+# What-if scenario exploration
+#
+# Each scenario is one variant of solver inputs (doctor ordering, holiday set,
+# fairness history for assign_shifts; initial week and range for the
+# backwards rotation). Variants are evaluated in a process pool and ranked
+# best-first: fewest gap violations, then the most even Fri/Sat/Sun spread.
+
+import os
+from collections import defaultdict, namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+from .balance import count_fri_sat_sun, balance_spread, count_gap_violations
+from .rotation import generate_schedule
+from .solver import assign_shifts
+
+ShiftScenario = namedtuple("ShiftScenario", ["name", "dates", "doctors", "holidays", "weekend_history", "friday_history"],
+                           defaults=(None, None, None))
+RotationScenario = namedtuple("RotationScenario", ["name", "initial_week", "start_date", "end_date"])
+ScenarioResult = namedtuple("ScenarioResult", ["name", "gap_violations", "spread", "counts", "schedule"])
+
+# ---------------------------
+# Evaluation
+
+def evaluate_scenario(scenario):
+    if isinstance(scenario, RotationScenario):
+        schedule = generate_schedule(scenario.initial_week, scenario.start_date, scenario.end_date)
+        doctors = scenario.initial_week
+    else:
+        schedule = assign_shifts(scenario.dates, scenario.doctors,
+                                 weekend_history=defaultdict(int, scenario.weekend_history or {}),
+                                 friday_history=defaultdict(int, scenario.friday_history or {}),
+                                 holidays=scenario.holidays)
+        doctors = scenario.doctors
+    counts = count_fri_sat_sun(schedule, doctors)
+    return ScenarioResult(scenario.name, count_gap_violations(schedule), balance_spread(counts), counts, schedule)
+
+def rank_results(results):
+    return sorted(results, key=lambda r: (r.gap_violations, r.spread))
+
+# ---------------------------
+# Runner
+
+def run_scenarios(scenarios, max_workers=None, chunksize=None):
+    scenarios = list(scenarios)
+    if not scenarios:
+        return []
+    if max_workers == 1:
+        results = [evaluate_scenario(s) for s in scenarios]
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+            if chunksize is None:
+                workers = max_workers or os.cpu_count() or 1
+                chunksize = max(1, len(scenarios) // (workers*4))
+            results = list(pool.map(evaluate_scenario, scenarios, chunksize=chunksize))
+    return rank_results(results)
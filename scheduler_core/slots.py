@@ -0,0 +1,161 @@
+# Several named shift slots per day
+#
+# A day can staff N slots (e.g. on-call, ward, ER). A doctor works at most one
+# slot per day; each slot type has its own gap and weekend-spacing rules and
+# its own fairness histories. Slots are solved in the given order with the
+# greedy solver, and the days a doctor already holds in an earlier slot are
+# blocked for the later ones. The result is one flat array of doctor ids,
+# day-major (day * n_slots + slot), instead of nested dicts. A slot that
+# nobody can take on a day (everyone holds another slot or is on leave) is
+# left empty rather than double-booking a doctor.
+
+from array import array
+from collections import defaultdict, namedtuple
+from datetime import date
+
+from .availability import Availability
+from .calendar_index import WEEKDAY_CLASS, FRIDAY, SATURDAY, SUNDAY
+from .rotation import generate_schedule
+from .rules import GAP, WEEKEND_SPACING
+from .solver import assign_shifts
+from .state_file import NO_DOCTOR
+
+CLASS_NAMES = {FRIDAY: "Friday", SATURDAY: "Saturday", SUNDAY: "Sunday"}
+
+Slot = namedtuple("Slot", ["name", "gap", "weekend_spacing"], defaults=[GAP, WEEKEND_SPACING])
+
+# ---------------------------
+# Storage
+
+class SlotSchedule:
+    def __init__(self, first, n_days, slots, doctors=()):
+        self.origin = first.toordinal() if first else 0
+        self.n_days = n_days
+        self.slots = list(slots)
+        self.doctors = list(doctors)
+        self._slot_id = {name: k for k, name in enumerate(self.slots)}
+        self._doc_id = {doc: i for i, doc in enumerate(self.doctors)}
+        self.ids = array("H", [NO_DOCTOR]) * (n_days * len(self.slots))
+
+    def _pos(self, d, slot):
+        offset = d.toordinal() - self.origin
+        if not 0 <= offset < self.n_days:
+            raise KeyError(d)
+        return offset * len(self.slots) + self._slot_id[slot]
+
+    def _doctor_id(self, doc):
+        if doc not in self._doc_id:
+            self._doc_id[doc] = len(self.doctors)
+            self.doctors.append(doc)
+        return self._doc_id[doc]
+
+    def get(self, d, slot):
+        k = self.ids[self._pos(d, slot)]
+        return None if k == NO_DOCTOR else self.doctors[k]
+
+    def set(self, d, slot, doc):
+        self.ids[self._pos(d, slot)] = NO_DOCTOR if doc is None else self._doctor_id(doc)
+
+    def dates(self):
+        return [date.fromordinal(self.origin + i) for i in range(self.n_days)]
+
+    def day(self, d):
+        base = self._pos(d, self.slots[0])
+        return {slot: (None if k == NO_DOCTOR else self.doctors[k])
+                for slot, k in zip(self.slots, self.ids[base:base + len(self.slots)])}
+
+    def slot_map(self, slot):
+        # {date: doctor} for one slot, the shape the single-slot code expects
+        k, n = self._slot_id[slot], len(self.slots)
+        return {date.fromordinal(self.origin + i): self.doctors[doc_id]
+                for i, doc_id in enumerate(self.ids[k::n]) if doc_id != NO_DOCTOR}
+
+    def double_booked(self):
+        # (date, doctor) wherever a doctor holds more than one slot on a day
+        n = len(self.slots)
+        clashes = []
+        for i in range(self.n_days):
+            seen = set()
+            for k in self.ids[i*n:(i+1)*n]:
+                if k != NO_DOCTOR:
+                    if k in seen:
+                        clashes.append((date.fromordinal(self.origin + i), self.doctors[k]))
+                    seen.add(k)
+        return clashes
+
+    def counts(self):
+        # {slot: {doctor: {"Friday": n, "Saturday": n, "Sunday": n}}} in one
+        # pass over the array
+        n_slots, n_docs = len(self.slots), len(self.doctors)
+        tally = [0] * (n_slots * n_docs * 3)
+        first_wd = (self.origin + 6) % 7
+        for i in range(self.n_days):
+            day_class = WEEKDAY_CLASS[(first_wd + i) % 7]
+            if day_class < FRIDAY:
+                continue
+            for k, doc_id in enumerate(self.ids[i*n_slots:(i+1)*n_slots]):
+                if doc_id != NO_DOCTOR:
+                    tally[(k*n_docs + doc_id)*3 + day_class - FRIDAY] += 1
+        return {slot: {doc: {CLASS_NAMES[c]: tally[(k*n_docs + i)*3 + c - FRIDAY] for c in CLASS_NAMES}
+                       for i, doc in enumerate(self.doctors)}
+                for k, slot in enumerate(self.slots)}
+
+# ---------------------------
+# Solving
+
+def _slot_history(histories, name):
+    history = histories.get(name)
+    if not isinstance(history, defaultdict):
+        history = histories[name] = defaultdict(int, history or {})
+    return history
+
+def assign_slots(dates, doctors, slots, weekend_history=None, friday_history=None, availability=None):
+    # slots: Slot tuples or plain names, in priority order; the histories map
+    # slot name -> {doctor: count} and are updated in place like assign_shifts
+    slots = [s if isinstance(s, Slot) else Slot(s) for s in slots]
+    if weekend_history is None:
+        weekend_history = {}
+    if friday_history is None:
+        friday_history = {}
+    dates = sorted(dates)
+    n_days = (dates[-1] - dates[0]).days + 1 if dates else 0
+    schedule = SlotSchedule(dates[0] if dates else None, n_days, [s.name for s in slots], doctors)
+
+    taken = availability.copy() if availability else Availability()
+    for slot in slots:
+        slot_weekends = _slot_history(weekend_history, slot.name)
+        slot_fridays = _slot_history(friday_history, slot.name)
+        assign_map = assign_shifts(dates, doctors, weekend_history=slot_weekends, friday_history=slot_fridays,
+                                   availability=taken, gap=slot.gap, weekend_spacing=slot.weekend_spacing)
+        for d, doc in assign_map.items():
+            if not taken.is_available(doc, d):
+                # The solver only forces an unavailable pick when nobody is
+                # free; leave the slot empty and take back the count
+                if d.weekday() >= 5:
+                    slot_weekends[doc] -= 1
+                elif d.weekday() == 4:
+                    slot_fridays[doc] -= 1
+                continue
+            schedule.set(d, slot.name, doc)
+            taken.add_leave(doc, d)
+    return schedule
+
+def rotation_slots(initial_weeks, start_date, end_date):
+    # initial_weeks: {slot name: [doctor for Mon..Sun]}. Every slot rotates
+    # the same way, so doctors distinct on each day of the first week stay
+    # distinct on every later day.
+    for i in range(7):
+        on_day = [week[i] for week in initial_weeks.values() if i < len(week)]
+        if len(on_day) != len(set(on_day)):
+            raise ValueError(f"doctor in more than one slot on day {i} of the initial week")
+    maps = {slot: generate_schedule(week, start_date, end_date) for slot, week in initial_weeks.items()}
+    days = [d for m in maps.values() for d in m]
+    if not days:
+        return SlotSchedule(None, 0, list(maps))
+    first = min(days)
+    doctors = list(dict.fromkeys(doc for week in initial_weeks.values() for doc in week))
+    schedule = SlotSchedule(first, (max(days) - first).days + 1, list(maps), doctors)
+    for slot, m in maps.items():
+        for d, doc in m.items():
+            schedule.set(d, slot, doc)
+    return schedule
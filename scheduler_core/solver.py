@@ -0,0 +1,145 @@
+# Shift assignment solver shared by the desktop and Streamlit front-ends
+
+from collections import defaultdict, deque
+
+from . import instrument
+from .calendar_index import categorize_dates
+from .constraints import ConstraintChecker
+from .doctor_queue import DoctorQueue
+from .rules import GAP, WEEKEND_SPACING
+
+# ---------------------------
+# Greedy passes (also used by the incremental re-solve in delta.py)
+
+def fair_share(total, doctors, counts=None):
+    # Shifts every doctor gets and how many may take one extra; shifts
+    # already in counts (fixed days of a re-solve) use the extras up
+    base_count = total // len(doctors)
+    extras = total - base_count*len(doctors)
+    if counts:
+        extras -= sum(max(0, counts[doc] - base_count) for doc in doctors)
+    return base_count, extras
+
+def fallback(doctors, checker, can_assign, queue, di, is_weekend=False):
+    # No doctor passes every rule: take the best-ranked one who is at
+    # least available, keeping the gap rules if possible
+    free = [i for i in queue.ordered() if checker.available(doctors[i], di)]
+    for i in free:
+        if can_assign(doctors[i], di, is_weekend):
+            return i
+    return free[0] if free else queue.first()
+
+def ranked_pass(days, doctors, assign_map, checker, can_assign, queue, counts, history, share, is_weekend=False):
+    # Weekend or Friday pass: each day goes to the best-ranked doctor under
+    # the fair-share cap who passes every rule. Returns the number of days
+    # that had to be forced
+    base_count, extras = share
+    forced = 0
+    for d in days:
+        di = checker.index(d)
+        assigned = False
+        for i in queue.ordered():
+            doc = doctors[i]
+            max_shifts = base_count + (1 if extras > 0 else 0)
+            if counts[doc] >= max_shifts:
+                continue
+            if not can_assign(doc, di, is_weekend):
+                continue
+            assigned = True
+            break
+        if not assigned:
+            i = fallback(doctors, checker, can_assign, queue, di, is_weekend) if checker.blocked else queue.first()
+            doc = doctors[i]
+            forced += 1
+        assign_map[d] = doc
+        checker.place(doc, di, is_weekend)
+        counts[doc] += 1
+        history[doc] += 1
+        if assigned and extras > 0 and counts[doc] > base_count:
+            extras -= 1
+        queue.update(i)
+    return forced
+
+def cycle_pass(days, assign_map, checker, can_assign, cycle):
+    # Weekday pass: the rotation moves on to the next doctor who passes
+    # the gap rule. Returns the number of days that had to be forced
+    forced = 0
+    for d in days:
+        di = checker.index(d)
+        for _ in range(len(cycle)):
+            if can_assign(cycle[0], di):
+                break
+            cycle.rotate(-1)
+        else:
+            if checker.blocked:
+                # keep the forced pick to someone who is not on leave
+                for _ in range(len(cycle)):
+                    if checker.available(cycle[0], di):
+                        break
+                    cycle.rotate(-1)
+            forced += 1
+        assign_map[d] = cycle[0]
+        checker.place(cycle[0], di)
+        cycle.rotate(-1)
+    return forced
+
+# ---------------------------
+# Scheduler logic
+
+def assign_shifts(dates, doctors, prev_assignments=None, weekend_history=None, friday_history=None, holidays=None,
+                  availability=None, gap=GAP, weekend_spacing=WEEKEND_SPACING):
+    # holidays are still working shifts, so the same rules apply on them;
+    # availability (leave, weekday limits) takes doctors out of the running
+    if prev_assignments is None:
+        prev_assignments = {}
+    if weekend_history is None:
+        weekend_history = defaultdict(int)
+    if friday_history is None:
+        friday_history = defaultdict(int)
+    rec = instrument.start("assign_shifts")
+
+    weekdays, fridays, saturdays, sundays = categorize_dates(dates)
+    assign_map = {}
+
+    # Gap between shifts (2 days by default) and weekend spacing (7), on day indices
+    checker = ConstraintChecker(min(dates), gap, weekend_spacing) if dates else None
+    can_assign = checker.can_assign if dates else None
+    if availability and dates:
+        checker.load_availability(availability, doctors, checker.index(max(dates)) + 1)
+
+    if rec:
+        can_assign = rec.counting("can_assign", can_assign)
+        rec.lap("setup")
+
+    # Step 1: Weekends
+    weekend_days = sorted(saturdays + sundays)
+    weekend_assign_counts = defaultdict(int)
+    if weekend_days:
+        queue = DoctorQueue(doctors, key=lambda doc: (weekend_history[doc], weekend_assign_counts[doc]))
+        forced = ranked_pass(weekend_days, doctors, assign_map, checker, can_assign, queue, weekend_assign_counts,
+                             weekend_history, fair_share(len(weekend_days), doctors), True)
+        if rec and forced:
+            rec.count("weekend_fallback", forced)
+    if rec:
+        rec.lap("weekend_pass")
+
+    # Step 2: Fridays
+    friday_assign_counts = defaultdict(int)
+    if fridays:
+        queue = DoctorQueue(doctors, key=lambda doc: (weekend_assign_counts[doc], friday_history[doc]))
+        forced = ranked_pass(fridays, doctors, assign_map, checker, can_assign, queue, friday_assign_counts,
+                             friday_history, fair_share(len(fridays), doctors))
+        if rec and forced:
+            rec.count("friday_fallback", forced)
+    if rec:
+        rec.lap("friday_pass")
+
+    # Step 3: Weekdays
+    forced = cycle_pass(weekdays, assign_map, checker, can_assign, deque(doctors))
+    if rec:
+        if forced:
+            rec.count("weekday_fallback", forced)
+        rec.lap("weekday_pass")
+        rec.count("days", len(assign_map))
+        instrument.finish(rec)
+    return assign_map
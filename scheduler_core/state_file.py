@@ -0,0 +1,277 @@
+# Versioned binary schedule state
+#
+# Replaces the pickled schedule_state.pkl. Layout (all little-endian):
+#
+#   header        magic, version, doctor count, origin day (proleptic
+#                 ordinal), day count, generated month count
+#   doctor table  u16 length + UTF-8 name, per doctor
+#   histories     i32 weekend count, then i32 Friday count, per doctor
+#   months        u16 year + u16 month, per generated month
+#   holidays      bitset, one bit per day from the origin
+#   assignments   u16 doctor id per day from the origin (NO_DOCTOR if empty)
+#   leave         (version 2) u32 count, then per doctor with leave: u16
+#                 doctor id, i32 origin ordinal, u32 byte length and the
+#                 little-endian leave bitmask
+#   weekdays      (version 2) u32 count, then per doctor limited to some
+#                 weekdays: u16 doctor id, u8 weekday mask (bit 0 = Monday)
+#
+# The file is read through mmap; month() decodes only the slice of the
+# assignment array covering that month. Older pickled state can be converted
+# with migrate_pickle().
+
+import functools
+import mmap
+import struct
+from datetime import date
+
+from .availability import Availability
+from .store import AssignmentStore
+
+MAGIC = b"SCHD"
+VERSION = 2
+NO_DOCTOR = 0xFFFF
+
+HEADER = struct.Struct("<4sHHiII")
+NAME_LEN = struct.Struct("<H")
+MONTH = struct.Struct("<HH")
+COUNT = struct.Struct("<I")
+LEAVE = struct.Struct("<HiI")
+WEEKDAYS = struct.Struct("<HB")
+
+
+class StateFormatError(ValueError):
+    pass
+
+def _decoding(method):
+    # Whatever a damaged file trips over while decoding (short reads, bad
+    # UTF-8, ids or ordinals out of range) is reported as StateFormatError
+    @functools.wraps(method)
+    def wrapper(*args, **kwargs):
+        try:
+            return method(*args, **kwargs)
+        except StateFormatError:
+            raise
+        except (struct.error, UnicodeDecodeError, IndexError, ValueError, OverflowError) as e:
+            raise StateFormatError(f"corrupt schedule state file: {e}") from e
+    return wrapper
+
+# ---------------------------
+# Writing
+
+def _holiday_days(days):
+    # Holidays are kept as day-of-month ints by the desktop app and as dates
+    # by the Streamlit app
+    return {d.day if isinstance(d, date) else int(d) for d in days}
+
+def encode_state(state):
+    assignments = state.get("prev_assignments", {})
+    weekend_history = state.get("weekend_history", {})
+    friday_history = state.get("friday_history", {})
+    months = [tuple(ym) for ym in state.get("generated_months", [])]
+    holidays = {tuple(ym): _holiday_days(days) for ym, days in state.get("holidays", {}).items() if days}
+    leave, weekdays = (state.get("availability") or Availability()).fingerprint()
+
+    doctors = list(dict.fromkeys(list(state.get("doctors", [])) + list(assignments.values())
+                                 + list(weekend_history) + list(friday_history)
+                                 + [doc for doc, _, _ in leave] + [doc for doc, _ in weekdays]))
+    doc_id = {doc: i for i, doc in enumerate(doctors)}
+
+    ordinals = [d.toordinal() for d in assignments]
+    ordinals += [date(ym[0], ym[1], day).toordinal() for ym, days in holidays.items() for day in days]
+    origin = min(ordinals) if ordinals else 0
+    n_days = max(ordinals) - origin + 1 if ordinals else 0
+
+    out = bytearray(HEADER.pack(MAGIC, VERSION, len(doctors), origin, n_days, len(months)))
+    for doc in doctors:
+        name = doc.encode("utf-8")
+        out += NAME_LEN.pack(len(name)) + name
+    out += struct.pack(f"<{len(doctors)}i", *[weekend_history.get(doc, 0) for doc in doctors])
+    out += struct.pack(f"<{len(doctors)}i", *[friday_history.get(doc, 0) for doc in doctors])
+    for ym in months:
+        out += MONTH.pack(*ym)
+
+    bits = bytearray((n_days + 7) // 8)
+    for ym, days in holidays.items():
+        for day in days:
+            i = date(ym[0], ym[1], day).toordinal() - origin
+            bits[i >> 3] |= 1 << (i & 7)
+    out += bits
+
+    if len(out) % 2:
+        out += b"\0"
+    ids = [NO_DOCTOR]*n_days
+    for d, doc in assignments.items():
+        ids[d.toordinal() - origin] = doc_id[doc]
+    out += struct.pack(f"<{n_days}H", *ids)
+
+    out += COUNT.pack(len(leave))
+    for doc, leave_origin, bits in leave:
+        mask = bits.to_bytes((bits.bit_length() + 7) // 8, "little")
+        out += LEAVE.pack(doc_id[doc], leave_origin, len(mask)) + mask
+    out += COUNT.pack(len(weekdays))
+    for doc, mask in weekdays:
+        out += WEEKDAYS.pack(doc_id[doc], mask)
+    return bytes(out)
+
+def save_state(path, state):
+    with open(path, "wb") as f:
+        f.write(encode_state(state))
+
+# ---------------------------
+# Reading
+
+class StateFile:
+    def __init__(self, path):
+        self._file = open(path, "rb")
+        try:
+            self.buf = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # empty file: mmap refuses zero-length mappings
+            self.buf = b""
+        try:
+            self._parse_header()
+        except Exception:
+            self.close()
+            raise
+
+    @_decoding
+    def _parse_header(self):
+        if len(self.buf) < HEADER.size:
+            raise StateFormatError("not a schedule state file")
+        magic, version, n_doctors, self.origin, self.n_days, n_months = HEADER.unpack_from(self.buf, 0)
+        if magic != MAGIC:
+            raise StateFormatError("not a schedule state file")
+        if version > VERSION:
+            raise StateFormatError(f"state file version {version} is newer than supported version {VERSION}")
+        self.version = version
+
+        pos = HEADER.size
+        self.doctors = []
+        for _ in range(n_doctors):
+            (size,) = NAME_LEN.unpack_from(self.buf, pos)
+            pos += NAME_LEN.size
+            self.doctors.append(bytes(self.buf[pos:pos+size]).decode("utf-8"))
+            pos += size
+        self.weekend_counts = struct.unpack_from(f"<{n_doctors}i", self.buf, pos)
+        pos += 4*n_doctors
+        self.friday_counts = struct.unpack_from(f"<{n_doctors}i", self.buf, pos)
+        pos += 4*n_doctors
+        self.months = [MONTH.unpack_from(self.buf, pos + i*MONTH.size) for i in range(n_months)]
+        pos += MONTH.size*n_months
+        self._holidays_at = pos
+        pos += (self.n_days + 7) // 8
+        self._assign_at = pos + (pos % 2)
+        self._leave_at = self._assign_at + 2*self.n_days
+        if len(self.buf) < self._leave_at:
+            raise StateFormatError("truncated schedule state file")
+
+    def close(self):
+        if isinstance(self.buf, mmap.mmap):
+            self.buf.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # ---------------------------
+    # Partial reads
+
+    def _day_range(self, first, last):
+        # Clip [first, last] ordinals to the stored span
+        lo = max(first - self.origin, 0)
+        hi = min(last - self.origin, self.n_days - 1)
+        return lo, hi
+
+    @_decoding
+    def month(self, ym):
+        year, month = ym
+        first = date(year, month, 1).toordinal()
+        last = (date(year + 1, 1, 1) if month == 12 else date(year, month + 1, 1)).toordinal() - 1
+        lo, hi = self._day_range(first, last)
+        if hi < lo:
+            return {}
+        ids = struct.unpack_from(f"<{hi - lo + 1}H", self.buf, self._assign_at + 2*lo)
+        return {date.fromordinal(self.origin + lo + i): self.doctors[k] for i, k in enumerate(ids) if k != NO_DOCTOR}
+
+    @_decoding
+    def month_holidays(self, ym):
+        year, month = ym
+        days = set()
+        for day in range(1, 32):
+            try:
+                i = date(year, month, day).toordinal() - self.origin
+            except ValueError:
+                break
+            if 0 <= i < self.n_days and self.buf[self._holidays_at + (i >> 3)] & (1 << (i & 7)):
+                days.add(day)
+        return days
+
+    # ---------------------------
+    # Full reads
+
+    @_decoding
+    def assignments(self):
+        ids = struct.unpack_from(f"<{self.n_days}H", self.buf, self._assign_at)
+        return AssignmentStore((date.fromordinal(self.origin + i), self.doctors[k])
+                               for i, k in enumerate(ids) if k != NO_DOCTOR)
+
+    @_decoding
+    def holidays(self):
+        result = {}
+        for i in range(self.n_days):
+            if self.buf[self._holidays_at + (i >> 3)] & (1 << (i & 7)):
+                d = date.fromordinal(self.origin + i)
+                result.setdefault((d.year, d.month), set()).add(d.day)
+        return result
+
+    @_decoding
+    def availability(self):
+        # Leave and weekday limits; empty for version 1 files, which had none
+        if self.version < 2:
+            return Availability()
+        pos = self._leave_at
+        (n_leave,) = COUNT.unpack_from(self.buf, pos)
+        pos += COUNT.size
+        leave = []
+        for _ in range(n_leave):
+            k, origin, size = LEAVE.unpack_from(self.buf, pos)
+            pos += LEAVE.size
+            leave.append((self.doctors[k], origin, int.from_bytes(self.buf[pos:pos+size], "little")))
+            pos += size
+        (n_weekdays,) = COUNT.unpack_from(self.buf, pos)
+        pos += COUNT.size
+        weekdays = []
+        for _ in range(n_weekdays):
+            k, mask = WEEKDAYS.unpack_from(self.buf, pos)
+            pos += WEEKDAYS.size
+            weekdays.append((self.doctors[k], mask))
+        return Availability.from_fingerprint((leave, weekdays))
+
+    def to_state(self):
+        return {
+            "prev_assignments": self.assignments(),
+            "weekend_history": {doc: n for doc, n in zip(self.doctors, self.weekend_counts) if n},
+            "friday_history": {doc: n for doc, n in zip(self.doctors, self.friday_counts) if n},
+            "generated_months": list(self.months),
+            "holidays": self.holidays(),
+            "doctors": list(self.doctors),
+            "availability": self.availability(),
+        }
+
+def load_state(path):
+    with StateFile(path) as f:
+        return f.to_state()
+
+# ---------------------------
+# Migration
+
+def migrate_pickle(pkl_path, out_path):
+    # Only for state files this app wrote itself: unpickling runs arbitrary code
+    import pickle
+    with open(pkl_path, "rb") as f:
+        state = pickle.load(f)
+    save_state(out_path, state)
+    return load_state(out_path)
@@ -0,0 +1,73 @@
+# Assignment store with incremental balance counters
+#
+# Behaves like the plain {date: doctor} dict the apps already keep as
+# prev_assignments, but every write, overwrite and delete also updates a
+# per-doctor count of shifts by weekday. Balance panels read those counters
+# instead of rescanning the whole history for every doctor.
+
+
+class AssignmentStore(dict):
+    def __init__(self, *args, **kwargs):
+        super().__init__()
+        self.weekday_counts = {}
+        self.update(*args, **kwargs)
+
+    def __reduce__(self):
+        # Rebuild through __init__ so the counters are recomputed on unpickle
+        return (type(self), (dict(self),))
+
+    def _count(self, doc, d, step):
+        counts = self.weekday_counts.get(doc)
+        if counts is None:
+            counts = self.weekday_counts[doc] = [0]*7
+        counts[d.weekday()] += step
+
+    # ---------------------------
+    # Writes
+
+    def __setitem__(self, d, doc):
+        old = self.get(d)
+        if old is not None:
+            self._count(old, d, -1)
+        super().__setitem__(d, doc)
+        self._count(doc, d, 1)
+
+    def __delitem__(self, d):
+        self._count(self[d], d, -1)
+        super().__delitem__(d)
+
+    def update(self, *args, **kwargs):
+        for d, doc in dict(*args, **kwargs).items():
+            self[d] = doc
+
+    def __ior__(self, other):
+        self.update(other)
+        return self
+
+    def setdefault(self, d, doc=None):
+        if d not in self:
+            self[d] = doc
+        return self[d]
+
+    def pop(self, d, *default):
+        if d in self:
+            doc = self[d]
+            del self[d]
+            return doc
+        return super().pop(d, *default)
+
+    def popitem(self):
+        d, doc = super().popitem()
+        self._count(doc, d, -1)
+        return d, doc
+
+    def clear(self):
+        super().clear()
+        self.weekday_counts.clear()
+
+    # ---------------------------
+    # Reads
+
+    def count(self, doc, weekday):
+        counts = self.weekday_counts.get(doc)
+        return counts[weekday] if counts else 0
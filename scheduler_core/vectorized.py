@@ -0,0 +1,211 @@
+# Array-backed shift assignment engine
+#
+# Same rules and tie-breaking as solver.assign_shifts, but the horizon is held
+# as integer day indices, a weekday-class array and a doctor x day occupancy
+# array, so the gap and weekend-spacing checks are array masks over all
+# doctors at once instead of per-candidate dict lookups on date keys. Leave
+# and weekday limits from an Availability become a doctor x day blocked
+# mask that is ANDed into the same eligibility step.
+
+from collections import defaultdict
+
+import numpy as np
+
+from .calendar_index import WEEKDAY, FRIDAY, SATURDAY, WEEKDAY_CLASS
+from .rules import GAP, WEEKEND_SPACING
+
+_WEEKDAY_CLASS = np.array(WEEKDAY_CLASS, dtype=np.int8)
+_NO_PICK = np.iinfo(np.int64).max
+
+# ---------------------------
+# Horizon
+
+class Horizon:
+    def __init__(self, dates):
+        self.dates = list(dates)
+        self.origin = min(self.dates)
+        self.index = np.array([(d - self.origin).days for d in self.dates], dtype=np.int64)
+        self.span = int(self.index.max()) + 1
+        first_wd = self.origin.weekday()
+        self.day_class = _WEEKDAY_CLASS[(np.arange(self.span) + first_wd) % 7]
+
+    def day_index(self, d):
+        return (d - self.origin).days
+
+
+class Occupancy:
+    # day x doctor count of each doctor's shifts within gap days, padded by
+    # gap rows on both sides so the window around any day of the horizon
+    # can be updated without bounds checks. Placing a shift bumps its whole
+    # window once, so testing a day is a single row read instead of a
+    # reduction over the window; the day itself is still empty while it is
+    # being filled
+    def __init__(self, n_doctors, span, gap=GAP):
+        self.gap = gap
+        self.near = np.zeros((span + 2*gap, n_doctors), dtype=np.int16)
+
+    def set(self, doc_idx, day_idx):
+        self.near[day_idx:day_idx + 2*self.gap + 1, doc_idx] += 1
+
+    def clear(self, doc_idx, day_idx):
+        self.near[day_idx:day_idx + 2*self.gap + 1, doc_idx] -= 1
+
+    def gap_free(self, day_idx):
+        return self.near[day_idx + self.gap] == 0
+
+    def doc_gap_free(self, doc_idx, day_idx):
+        return self.near[day_idx + self.gap, doc_idx] == 0
+
+
+def blocked_mask(availability, doctors, horizon, margin=0):
+    # day x doctor, True where the doctor cannot work. None if nobody is
+    # blocked within margin days before the horizon or anywhere in it, the
+    # same test the scalar solver uses to decide whether to fall back by
+    # availability.
+    first = horizon.origin.toordinal()
+    mask = np.zeros((horizon.span, len(doctors)), dtype=bool)
+    any_blocked = False
+    for k, doc in enumerate(doctors):
+        bits = availability.blocked_bits(doc, first - margin, horizon.span + margin)
+        any_blocked = any_blocked or bool(bits)
+        bits >>= margin
+        while bits:
+            low = bits & -bits
+            mask[low.bit_length() - 1, k] = True
+            bits ^= low
+    return mask if any_blocked else None
+
+# ---------------------------
+# Engine
+#
+# The weekend and Friday rankings are packed into one unique int64 key per
+# doctor (rank fields, then the doctor index as the final tie-break), so the
+# best-ranked doctor who passes every rule is a masked argmin, and placing a
+# shift only bumps that doctor's key instead of re-sorting everyone.
+
+def assign_shifts_vectorized(dates, doctors, prev_assignments=None, weekend_history=None, friday_history=None, holidays=None,
+                             availability=None, gap=GAP, weekend_spacing=WEEKEND_SPACING):
+    if weekend_history is None:
+        weekend_history = defaultdict(int)
+    if friday_history is None:
+        friday_history = defaultdict(int)
+
+    assign_map = {}
+    if not dates:
+        return assign_map
+
+    n = len(doctors)
+    horizon = Horizon(dates)
+    occ = Occupancy(n, horizon.span, gap)
+    blocked = blocked_mask(availability, doctors, horizon, max(gap, weekend_spacing)) if availability else None
+    doc_idx = np.arange(n, dtype=np.int64)
+
+    classes = horizon.day_class[horizon.index]
+    days = list(zip(horizon.index.tolist(), horizon.dates, classes.tolist()))
+    weekend_days = sorted((i, d) for i, d, c in days if c >= SATURDAY)
+    fridays = [(i, d) for i, d, c in days if c == FRIDAY]
+    weekdays = [(i, d) for i, d, c in days if c == WEEKDAY]
+
+    def fallback(order, i, spacing_ok=True):
+        # No doctor passes every rule: take the best-ranked one who is at
+        # least available, keeping the gap rules if possible
+        free = ~blocked[i][order]
+        keep = free & (occ.gap_free(i) & spacing_ok)[order]
+        if keep.any():
+            return int(order[keep.argmax()])
+        return int(order[free.argmax()]) if free.any() else int(order[0])
+
+    def pick(key, ok, i, spacing_ok=True):
+        cand = np.where(ok, key, _NO_PICK)
+        k = int(cand.argmin())
+        if cand[k] != _NO_PICK:
+            return k, True
+        if blocked is not None:
+            return fallback(np.argsort(key), i, spacing_ok), False
+        return int(key.argmin()), False
+
+    def place(k, d, i):
+        occ.set(k, i)
+        assign_map[d] = doctors[k]
+
+    # Step 1: Weekends, ranked by (weekend history, weekend count)
+    weekend_hist = np.array([weekend_history[doc] for doc in doctors], dtype=np.int64)
+    weekend_counts = np.zeros(n, dtype=np.int64)
+    last_weekend = np.full(n, np.iinfo(np.int64).min // 2, dtype=np.int64)
+    total = len(weekend_days)
+    base_count = total // n
+    extras = total - base_count*n
+    # the count never reaches total+1, so it cannot carry into the history
+    stride = total + 1
+    key = (weekend_hist*stride + weekend_counts)*n + doc_idx
+
+    for i, d in weekend_days:
+        max_shifts = base_count + (1 if extras > 0 else 0)
+        spacing_ok = last_weekend < i - weekend_spacing
+        ok = (weekend_counts < max_shifts) & occ.gap_free(i) & spacing_ok
+        if blocked is not None:
+            ok &= ~blocked[i]
+        k, assigned = pick(key, ok, i, spacing_ok)
+        place(k, d, i)
+        weekend_counts[k] += 1
+        weekend_hist[k] += 1
+        key[k] += (stride + 1)*n
+        last_weekend[k] = i
+        if assigned and extras > 0 and weekend_counts[k] > base_count:
+            extras -= 1
+
+    if weekend_days:
+        for k, doc in enumerate(doctors):
+            weekend_history[doc] = int(weekend_hist[k])
+
+    # Step 2: Fridays, ranked by (weekend count, Friday history)
+    friday_hist = np.array([friday_history[doc] for doc in doctors], dtype=np.int64)
+    friday_counts = np.zeros(n, dtype=np.int64)
+    total = len(fridays)
+    base_count = total // n
+    extras = total - base_count*n
+    low = int(friday_hist.min()) if n else 0
+    stride = int(friday_hist.max()) - low + total + 1 if n else 1
+    key = (weekend_counts*stride + friday_hist - low)*n + doc_idx
+
+    for i, d in fridays:
+        max_shifts = base_count + (1 if extras > 0 else 0)
+        ok = (friday_counts < max_shifts) & occ.gap_free(i)
+        if blocked is not None:
+            ok &= ~blocked[i]
+        k, assigned = pick(key, ok, i)
+        place(k, d, i)
+        friday_counts[k] += 1
+        friday_hist[k] += 1
+        key[k] += n
+        if assigned and extras > 0 and friday_counts[k] > base_count:
+            extras -= 1
+
+    if fridays:
+        for k, doc in enumerate(doctors):
+            friday_history[doc] = int(friday_hist[k])
+
+    # Step 3: Weekdays
+    ptr = 0
+    for i, d in weekdays:
+        if occ.doc_gap_free(ptr, i) and (blocked is None or not blocked[i, ptr]):
+            place(ptr, d, i)
+            ptr = (ptr + 1) % n
+            continue
+        ok = occ.gap_free(i)
+        if blocked is not None:
+            ok &= ~blocked[i]
+        # first free doctor after the cycle pointer, wrapping around;
+        # failing that, the first one who is at least available
+        if not ok.any():
+            ok = ~blocked[i] if blocked is not None else ok
+        if ok[ptr:].any():
+            k = ptr + int(ok[ptr:].argmax())
+        elif ok[:ptr].any():
+            k = int(ok[:ptr].argmax())
+        else:
+            k = ptr
+        place(k, d, i)
+        ptr = (k + 1) % n
+
+    return assign_map
@@ -0,0 +1,158 @@
+# Reference implementations from the original apps
+#
+# The dict- and date-based shift solver and the week-by-week rotation loop
+# as they were before the optimised engines replaced them. They are kept
+# only so the tests can check the current code gives the same results.
+
+import datetime
+from collections import defaultdict, deque
+from datetime import timedelta
+
+def categorize_dates(dates):
+    weekdays, fridays, saturdays, sundays = [], [], [], []
+    for d in dates:
+        wd = d.weekday()
+        if wd == 4:
+            fridays.append(d)
+        elif wd == 5:
+            saturdays.append(d)
+        elif wd == 6:
+            sundays.append(d)
+        else:
+            weekdays.append(d)
+    return weekdays, fridays, saturdays, sundays
+
+def assign_shifts(dates, doctors, prev_assignments=None, weekend_history=None, friday_history=None, holidays=None):
+    # holidays are still working shifts, so the same rules apply on them
+    if prev_assignments is None:
+        prev_assignments = {}
+    if weekend_history is None:
+        weekend_history = defaultdict(int)
+    if friday_history is None:
+        friday_history = defaultdict(int)
+
+    weekdays, fridays, saturdays, sundays = categorize_dates(dates)
+    assign_map = {}
+
+    last_weekend_doc = {}
+
+    def can_assign(doc, d, is_weekend=False):
+        # Strict 2-day gap
+        for delta in range(1,3):
+            if assign_map.get(d - timedelta(days=delta)) == doc:
+                return False
+            if assign_map.get(d + timedelta(days=delta)) == doc:
+                return False
+        if is_weekend:
+            prev_weekend = d - timedelta(days=7)
+            if last_weekend_doc.get(doc) and last_weekend_doc[doc] >= prev_weekend:
+                return False
+        return True
+
+    # Step 1: Weekends
+    weekend_days = sorted(saturdays + sundays)
+    total_weekends = len(weekend_days)
+    base_count = total_weekends // len(doctors)
+    extras = total_weekends - base_count*len(doctors)
+    weekend_assign_counts = defaultdict(int)
+
+    for d in weekend_days:
+        sorted_docs = sorted(doctors, key=lambda doc: (weekend_history[doc], weekend_assign_counts[doc]))
+        assigned = False
+        for doc in sorted_docs:
+            max_shifts = base_count + (1 if extras > 0 else 0)
+            if weekend_assign_counts[doc] >= max_shifts:
+                continue
+            if not can_assign(doc, d, is_weekend=True):
+                continue
+            assign_map[d] = doc
+            weekend_assign_counts[doc] += 1
+            weekend_history[doc] += 1
+            last_weekend_doc[doc] = d
+            if extras > 0 and weekend_assign_counts[doc] > base_count:
+                extras -= 1
+            assigned = True
+            break
+        if not assigned:
+            doc = sorted_docs[0]
+            assign_map[d] = doc
+            weekend_assign_counts[doc] += 1
+            weekend_history[doc] += 1
+            last_weekend_doc[doc] = d
+
+    # Step 2: Fridays
+    total_fridays = len(fridays)
+    base_count = total_fridays // len(doctors)
+    extras = total_fridays - base_count*len(doctors)
+    friday_assign_counts = defaultdict(int)
+
+    for d in fridays:
+        sorted_docs = sorted(doctors, key=lambda doc: (weekend_assign_counts[doc], friday_history[doc]))
+        assigned = False
+        for doc in sorted_docs:
+            max_shifts = base_count + (1 if extras > 0 else 0)
+            if friday_assign_counts[doc] >= max_shifts:
+                continue
+            if not can_assign(doc, d):
+                continue
+            assign_map[d] = doc
+            friday_assign_counts[doc] += 1
+            friday_history[doc] += 1
+            if extras > 0 and friday_assign_counts[doc] > base_count:
+                extras -= 1
+            assigned = True
+            break
+        if not assigned:
+            doc = sorted_docs[0]
+            assign_map[d] = doc
+            friday_assign_counts[doc] += 1
+            friday_history[doc] += 1
+
+    # Step 3: Weekdays
+    weekday_cycle = deque(doctors)
+    for d in weekdays:
+        for _ in range(len(weekday_cycle)):
+            doc = weekday_cycle[0]
+            if can_assign(doc, d):
+                assign_map[d] = doc
+                weekday_cycle.rotate(-1)
+                break
+            weekday_cycle.rotate(-1)
+        else:
+            assign_map[d] = weekday_cycle[0]
+            weekday_cycle.rotate(-1)
+
+    return assign_map
+
+def generate_schedule(initial_week, start_date, end_date):
+    schedule = {}
+    doctor_to_weekday = {doc: i for i, doc in enumerate(initial_week)}
+
+    # Preserve initial week
+    for i, doc in enumerate(initial_week):
+        schedule[start_date + datetime.timedelta(days=i)] = doc
+
+    current_week_start = start_date + datetime.timedelta(days=7)
+
+    while current_week_start <= end_date:
+        new_doctor_to_weekday = {doc: (wd - 2) % 7 for doc, wd in doctor_to_weekday.items()}
+        for doc, wd in new_doctor_to_weekday.items():
+            day_date = current_week_start + datetime.timedelta(days=wd)
+            if day_date <= end_date:
+                schedule[day_date] = doc
+        doctor_to_weekday = new_doctor_to_weekday
+        current_week_start += datetime.timedelta(days=7)
+
+    return schedule
+
+def compute_balance_fri_sat_sun(schedule, doctors):
+    counts = {doc: {"Friday":0, "Saturday":0, "Sunday":0} for doc in doctors}
+    for date, doc in schedule.items():
+        weekday = date.weekday()
+        if weekday == 4:
+            counts[doc]["Friday"] += 1
+        elif weekday == 5:
+            counts[doc]["Saturday"] += 1
+        elif weekday == 6:
+            counts[doc]["Sunday"] += 1
+    return counts
@@ -0,0 +1,76 @@
+from collections import defaultdict
+from functools import partial
+from datetime import date, timedelta
+
+import pytest
+
+from scheduler_core import Availability, assign_shifts, month_dates, solve_range
+from scheduler_core.optimize import assign_shifts_optimized, optimize_schedule
+from scheduler_core.vectorized import assign_shifts_vectorized
+
+DOCTORS = ["A", "B", "C", "D", "E", "F", "G"]
+ENGINES = [assign_shifts, assign_shifts_vectorized, partial(assign_shifts_optimized, max_iterations=2000, seed=1)]
+
+
+def leave():
+    av = Availability()
+    av.add_leave("A", date(2025, 3, 1), date(2025, 3, 14))
+    av.add_leave("C", date(2025, 3, 20), date(2025, 4, 5))
+    av.set_weekdays("E", [0, 1, 2, 3])
+    return av
+
+
+@pytest.mark.parametrize("solver", ENGINES)
+def test_engine_respects_leave(solver):
+    av = leave()
+    for result in solve_range((2025, 3), (2025, 4), DOCTORS, solver=solver, availability=av):
+        for d, doc in result.assignments.items():
+            assert av.is_available(doc, d), (d, doc)
+
+
+@pytest.mark.parametrize("gap, spacing", [(2, 7), (1, 5), (3, 10)])
+def test_vectorized_matches_scalar_with_leave(gap, spacing):
+    av = leave()
+    dates = month_dates(2025, 3)
+    histories = [(defaultdict(int), defaultdict(int)) for _ in range(2)]
+    a = assign_shifts(dates, DOCTORS, weekend_history=histories[0][0], friday_history=histories[0][1],
+                      availability=av, gap=gap, weekend_spacing=spacing)
+    b = assign_shifts_vectorized(dates, DOCTORS, weekend_history=histories[1][0], friday_history=histories[1][1],
+                                 availability=av, gap=gap, weekend_spacing=spacing)
+    assert a == b
+    assert histories[0] == histories[1]
+
+
+def test_leave_before_month_still_counts_for_fallback():
+    # Leave in the days just before the month switches both engines to the
+    # availability-aware fallback; they must agree on it
+    av = Availability()
+    av.add_leave("B", date(2025, 2, 25), date(2025, 2, 28))
+    dates = month_dates(2025, 3)
+    docs = DOCTORS[:3]
+    assert assign_shifts(dates, docs, availability=av) == assign_shifts_vectorized(dates, docs, availability=av)
+
+
+def test_everyone_on_leave_still_staffs_the_day():
+    av = Availability()
+    for doc in DOCTORS[:2]:
+        av.add_leave(doc, date(2025, 3, 10))
+    day = date(2025, 3, 10)
+    for solver in ENGINES:
+        assert solver([day, day + timedelta(days=1)], DOCTORS[:2], availability=av)[day] in DOCTORS[:2]
+
+
+def test_local_search_keeps_leave():
+    av = leave()
+    dates = month_dates(2025, 3)
+    greedy = assign_shifts(dates, DOCTORS[:4], availability=av)
+    result = optimize_schedule(greedy, DOCTORS[:4], availability=av, max_iterations=5000, seed=1)
+    for d, doc in result.assignments.items():
+        assert av.is_available(doc, d) or greedy[d] == doc, (d, doc)
+
+
+def test_optimized_is_a_drop_in_solver():
+    results = solve_range((2025, 1), (2025, 2), DOCTORS[:3],
+                          solver=partial(assign_shifts_optimized, max_iterations=500, seed=2))
+    for result in results:
+        assert set(result.assignments) == set(month_dates(*result.ym))
@@ -0,0 +1,57 @@
+from collections import defaultdict
+
+from scheduler_core import assign_shifts, month_dates
+from scheduler_core.availability import Availability
+from scheduler_core.cache import LRUCache, cached_assign_shifts
+
+DOCTORS = ["A", "B", "C", "D", "E"]
+
+
+def counting_solver():
+    calls = []
+
+    def solver(*args, **kwargs):
+        calls.append(1)
+        return assign_shifts(*args, **kwargs)
+    solver.calls = calls
+    return solver
+
+
+def solve(cache, solver, dates=None, doctors=DOCTORS, holidays=None, availability=None, history=None):
+    weekend_history, friday_history = (defaultdict(int, h) for h in (history or ({}, {})))
+    assign_map = cached_assign_shifts(cache, dates or month_dates(2025, 3), doctors, weekend_history, friday_history,
+                                      holidays=holidays, solver=solver, availability=availability)
+    return assign_map, dict(weekend_history), dict(friday_history)
+
+
+def test_hit_returns_the_schedule_and_replays_the_histories():
+    cache, solver = LRUCache(), counting_solver()
+    first = solve(cache, solver)
+    second = solve(cache, solver)
+    assert len(solver.calls) == 1
+    assert second == first
+    assert sum(second[1].values()) == 10 and sum(second[2].values()) == 4
+    assert cache.stats().hits == 1
+
+
+def test_changed_inputs_miss_the_cache():
+    cache, solver = LRUCache(), counting_solver()
+    solve(cache, solver)
+    leave = Availability()
+    leave.add_leave("A", month_dates(2025, 3)[0])
+    for kwargs in [{"dates": month_dates(2025, 4)}, {"doctors": DOCTORS[:4]},
+                   {"holidays": {month_dates(2025, 3)[5]}}, {"availability": leave},
+                   {"history": ({"A": 3}, {})}, {"history": ({}, {"B": 1})}]:
+        calls = len(solver.calls)
+        solve(cache, solver, **kwargs)
+        assert len(solver.calls) == calls + 1, kwargs
+
+
+def test_lru_evicts_the_least_recently_used():
+    cache = LRUCache(maxsize=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1
+    cache.put("c", 3)
+    assert cache.get("b") is None
+    assert (cache.get("a"), cache.get("c")) == (1, 3)
@@ -0,0 +1,84 @@
+import pytest
+
+from scheduler_core import cli, state_file
+
+
+@pytest.fixture
+def doctors(tmp_path):
+    path = tmp_path / "doctors.txt"
+    path.write_text("A\nB\nC\nD\n", encoding="utf-8")
+    return str(path)
+
+
+def test_unknown_doctor_in_leave_is_an_error(tmp_path, doctors, capsys):
+    leave = tmp_path / "leave.csv"
+    leave.write_text("A,2025-01-06\nzz,2025-01-05\n", encoding="utf-8")
+    with pytest.raises(SystemExit) as exc:
+        cli.main(["shifts", "--doctors", doctors, "--start", "2025-01", "--end", "2025-01",
+                  "--leave", str(leave), "-q"])
+    assert exc.value.code == 2
+    assert "unknown doctor 'zz'" in capsys.readouterr().err
+
+
+def test_leave_is_saved_with_state(tmp_path, doctors):
+    leave = tmp_path / "leave.csv"
+    leave.write_text("B,2025-01-06,2025-01-12\n", encoding="utf-8")
+    saved = tmp_path / "out.sched"
+    assert cli.main(["shifts", "--doctors", doctors, "--start", "2025-01", "--end", "2025-02",
+                     "--leave", str(leave), "--save-state", str(saved), "-q", "-o", str(tmp_path / "out.csv")]) == 0
+    availability = state_file.load_state(saved)["availability"]
+    assert availability.leave_days("B")[0].isoformat() == "2025-01-06"
+    assert len(availability.leave_days("B")) == 7
+
+
+def test_bad_month_is_a_usage_error(doctors, capsys):
+    with pytest.raises(SystemExit) as exc:
+        cli.main(["shifts", "--doctors", doctors, "--start", "2025-13", "--end", "2025-12"])
+    assert exc.value.code == 2
+    assert "invalid month '2025-13'" in capsys.readouterr().err
+
+
+def test_shifts_output(tmp_path, doctors):
+    out = tmp_path / "out.csv"
+    assert cli.main(["shifts", "--doctors", doctors, "--start", "2024-12", "--end", "2025-01", "-q", "-o", str(out)]) == 0
+    rows = out.read_text(encoding="utf-8").splitlines()
+    assert rows[0] == "date,weekday,doctor,holiday"
+    assert len(rows) == 1 + 31 + 31
+
+
+def input_error(argv, capsys):
+    with pytest.raises(SystemExit) as exc:
+        cli.main(argv + ["-q"])
+    assert exc.value.code == 2
+    return capsys.readouterr().err
+
+
+@pytest.mark.parametrize("option", ["--doctors", "--holidays"])
+def test_missing_input_file_is_an_error(tmp_path, doctors, option, capsys):
+    argv = ["shifts", "--doctors", doctors, "--start", "2025-01", "--end", "2025-01"]
+    argv += [option, str(tmp_path / "missing.txt")]
+    assert "missing.txt: No such file or directory" in input_error(argv, capsys)
+
+
+def test_empty_doctors_file_is_an_error(tmp_path, capsys):
+    empty = tmp_path / "empty.txt"
+    empty.write_text("# nobody yet\n", encoding="utf-8")
+    err = input_error(["shifts", "--doctors", str(empty), "--start", "2025-01", "--end", "2025-01"], capsys)
+    assert "no doctors listed" in err
+
+
+def test_corrupt_state_file_is_an_error(tmp_path, doctors, capsys):
+    state = tmp_path / "bad.sched"
+    state.write_bytes(b"not a state file at all")
+    err = input_error(["shifts", "--doctors", doctors, "--start", "2025-01", "--end", "2025-01",
+                       "--state", str(state)], capsys)
+    assert "not a schedule state file" in err
+
+
+@pytest.mark.parametrize("argv", [
+    ["shifts", "--start", "2025-03", "--end", "2025-01"],
+    ["rotation", "--start", "2025-03-03", "--end", "2025-01-31"],
+])
+def test_start_after_end_is_an_error(doctors, argv, capsys):
+    option = "--doctors" if argv[0] == "shifts" else "--initial-week"
+    assert "--start is after --end" in input_error(argv + [option, doctors], capsys)
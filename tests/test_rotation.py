@@ -0,0 +1,38 @@
+from datetime import date, timedelta
+
+import pytest
+
+from scheduler_core import Rotation, count_fri_sat_sun, generate_schedule, rotation_balance
+
+from . import baseline
+
+WEEK = ["Elena", "Eva", "Maria", "Athina", "Alexandros", "Elia", "Christina"]
+STARTS = [date(2025, 1, 6), date(2025, 1, 9), date(2024, 2, 29)]
+SPANS = [0, 3, 6, 7, 13, 48, 49, 50, 365, 3*365 + 11]
+WEEKS = [WEEK, WEEK[:5], WEEK + ["Extra"], WEEK[:3] + WEEK[:3]]
+
+
+@pytest.mark.parametrize("week", WEEKS)
+@pytest.mark.parametrize("start", STARTS)
+def test_closed_form_matches_weekly_loop(week, start):
+    for span in SPANS:
+        end = start + timedelta(days=span)
+        assert generate_schedule(week, start, end) == baseline.generate_schedule(week, start, end)
+
+
+@pytest.mark.parametrize("week", WEEKS)
+@pytest.mark.parametrize("start", STARTS)
+def test_balance_matches_counting_the_schedule(week, start):
+    doctors = list(dict.fromkeys(week))
+    for span in SPANS:
+        end = start + timedelta(days=span)
+        expected = baseline.compute_balance_fri_sat_sun(baseline.generate_schedule(week, start, end), doctors)
+        assert rotation_balance(week, start, end, doctors) == expected
+        assert count_fri_sat_sun(generate_schedule(week, start, end), doctors) == expected
+
+
+def test_doctor_on_matches_schedule():
+    start, end = date(2025, 1, 6), date(2025, 12, 31)
+    rotation = Rotation(WEEK, start)
+    for d, doc in baseline.generate_schedule(WEEK, start, end).items():
+        assert rotation.doctor_on(d, end) == doc
@@ -0,0 +1,48 @@
+from datetime import date
+
+from scheduler_core import Availability, Slot, assign_slots, count_fri_sat_sun, month_dates, rotation_slots
+from scheduler_core.state_file import NO_DOCTOR
+
+DOCTORS = ["A", "B", "C", "D", "E", "F", "G", "H"]
+
+
+def test_no_doctor_holds_two_slots():
+    schedule = assign_slots(month_dates(2025, 3), DOCTORS, ["on-call", "ward", "er"])
+    assert schedule.double_booked() == []
+    assert NO_DOCTOR not in schedule.ids
+
+
+def test_more_slots_than_doctors_leaves_slots_empty():
+    # Two doctors cannot staff three slots a day; the third stays empty
+    # instead of double-booking someone
+    weekend_history, friday_history = {}, {}
+    schedule = assign_slots(month_dates(2025, 3), DOCTORS[:2], ["a", "b", "c"], weekend_history, friday_history)
+    assert schedule.double_booked() == []
+    assert schedule.slot_map("c") == {}
+    assert sum(weekend_history["c"].values()) == 0
+    assert sum(friday_history["c"].values()) == 0
+
+
+def test_leave_and_slots():
+    av = Availability()
+    av.add_leave("A", date(2025, 3, 1), date(2025, 3, 31))
+    av.add_leave("B", date(2025, 3, 10), date(2025, 3, 16))
+    schedule = assign_slots(month_dates(2025, 3), DOCTORS[:4], [Slot("day", gap=1), Slot("night", gap=1)],
+                            availability=av)
+    assert schedule.double_booked() == []
+    for d in schedule.dates():
+        for doc in schedule.day(d).values():
+            assert doc is None or av.is_available(doc, d)
+
+
+def test_slot_counts_match_single_slot_balance():
+    schedule = assign_slots(month_dates(2025, 3), DOCTORS, ["on-call", "ward"])
+    counts = schedule.counts()
+    for slot in schedule.slots:
+        assert counts[slot] == count_fri_sat_sun(schedule.slot_map(slot), DOCTORS)
+
+
+def test_rotation_slots_distinct_per_day():
+    weeks = {"day": DOCTORS[:7], "night": DOCTORS[1:8]}
+    schedule = rotation_slots(weeks, date(2025, 1, 6), date(2025, 6, 30))
+    assert schedule.double_booked() == []
@@ -0,0 +1,146 @@
+import random
+from collections import defaultdict
+from datetime import date, timedelta
+
+import pytest
+
+from scheduler_core import Availability, ConstraintChecker, FairnessState, assign_shifts, month_dates, resolve_changed_days, solve_range
+from scheduler_core.vectorized import assign_shifts_vectorized
+
+from . import baseline
+
+
+def random_cases(n, seed=0):
+    rng = random.Random(seed)
+    for _ in range(n):
+        doctors = [f"Doctor {i}" for i in range(rng.randint(1, 12))]
+        ym = (rng.randint(2000, 2040), rng.randint(1, 12))
+        weekend_history = {doc: rng.randint(0, 4) for doc in doctors if rng.random() < 0.7}
+        friday_history = {doc: rng.randint(0, 4) for doc in doctors if rng.random() < 0.7}
+        yield month_dates(*ym), doctors, weekend_history, friday_history
+
+
+def solve(solver, dates, doctors, weekend_history, friday_history):
+    weekend_history = defaultdict(int, weekend_history)
+    friday_history = defaultdict(int, friday_history)
+    assign_map = solver(dates, doctors, weekend_history=weekend_history, friday_history=friday_history)
+    return (assign_map, {k: v for k, v in weekend_history.items() if v},
+            {k: v for k, v in friday_history.items() if v})
+
+
+@pytest.mark.parametrize("solver", [assign_shifts, assign_shifts_vectorized])
+def test_engines_match_baseline(solver):
+    for case in random_cases(300):
+        assert solve(solver, *case) == solve(baseline.assign_shifts, *case)
+
+
+def test_solve_range_matches_month_by_month_baseline():
+    doctors = ["A", "B", "C", "D", "E", "F", "G"]
+    weekend_history, friday_history = defaultdict(int), defaultdict(int)
+    for result in solve_range((2024, 11), (2025, 10), doctors):
+        expected = baseline.assign_shifts(month_dates(*result.ym), doctors,
+                                          weekend_history=weekend_history, friday_history=friday_history)
+        assert result.assignments == expected
+        assert result.state == FairnessState.from_histories(weekend_history, friday_history)
+
+
+def naive_can_assign(assigned, doc, d, gap, spacing, weekend, both_sides):
+    for delta in range(1, gap + 1):
+        if assigned.get(d - timedelta(days=delta), (None,))[0] == doc:
+            return False
+        if assigned.get(d + timedelta(days=delta), (None,))[0] == doc:
+            return False
+    if weekend:
+        for delta in range(1, spacing + 1):
+            for other in [d - timedelta(days=delta)] + ([d + timedelta(days=delta)] if both_sides else []):
+                if assigned.get(other) == (doc, True):
+                    return False
+    return True
+
+
+@pytest.mark.parametrize("gap, spacing", [(2, 7), (1, 3), (4, 10)])
+def test_constraint_checker_matches_date_checks(gap, spacing):
+    rng = random.Random(gap * 100 + spacing)
+    doctors = ["A", "B", "C"]
+    origin = date(2025, 3, 1)
+    for _ in range(50):
+        checker = ConstraintChecker(origin, gap, spacing)
+        assigned = {}
+        for _ in range(rng.randint(0, 20)):
+            d = origin + timedelta(days=rng.randint(0, 40))
+            doc, weekend = rng.choice(doctors), rng.random() < 0.4
+            if d in assigned:
+                continue
+            assigned[d] = (doc, weekend)
+            checker.place(doc, checker.index(d), weekend)
+        for _ in range(40):
+            d = origin + timedelta(days=rng.randint(0, 40))
+            doc, weekend, both_sides = rng.choice(doctors), rng.random() < 0.5, rng.random() < 0.5
+            expected = naive_can_assign(assigned, doc, d, gap, spacing, weekend, both_sides)
+            assert checker.can_assign(doc, checker.index(d), weekend, both_sides) == expected
+
+
+def test_resolve_without_changes_keeps_the_month():
+    doctors = ["A", "B", "C", "D", "E"]
+    dates = month_dates(2025, 5)
+    assign_map = assign_shifts(dates, doctors)
+    new_map, cells = resolve_changed_days(dict(assign_map), dates, doctors, set())
+    assert new_map == assign_map
+    assert not cells
+
+
+def rule_violations(assign_map, gap=2, spacing=7):
+    # Shifts closer than the gap, and weekend shifts closer than the spacing
+    days = sorted(assign_map)
+    gaps = spacings = 0
+    for i, d in enumerate(days):
+        for e in days[i+1:]:
+            if assign_map[e] != assign_map[d]:
+                continue
+            if (e - d).days <= gap:
+                gaps += 1
+            elif d.weekday() >= 5 and e.weekday() >= 5 and (e - d).days < spacing:
+                spacings += 1
+    return gaps, spacings
+
+
+def test_resolve_keeps_the_gap_to_fixed_neighbours():
+    doctors = ["Αθηνά", "Αλέξανδρος", "Έλενα", "Έλια", "Εύα", "Μαρία", "Χριστίνα"]
+    dates = month_dates(2024, 2)
+    assign_map = assign_shifts(dates, doctors)
+    new_map, _ = resolve_changed_days(dict(assign_map), dates, doctors, {date(2024, 2, 3)})
+    assert rule_violations(new_map) == (0, 0)
+
+
+def test_resolve_around_leave_breaks_no_more_rules_than_a_full_solve():
+    rng = random.Random(1)
+    for dates, doctors, weekend_history, friday_history in random_cases(300, seed=2):
+        if len(doctors) < 3:
+            continue
+        history = defaultdict(int, weekend_history), defaultdict(int, friday_history)
+        assign_map = assign_shifts(dates, doctors, weekend_history=history[0], friday_history=history[1])
+        # the doctors on a few days go on leave, so those days have to move
+        changed = set(rng.sample(dates, rng.randint(1, 3)))
+        availability = Availability()
+        for d in changed:
+            availability.add_leave(assign_map[d], d)
+        new_map, cells = resolve_changed_days(dict(assign_map), dates, doctors, changed, *history,
+                                              availability=availability)
+        full_map = assign_shifts(dates, doctors, weekend_history=defaultdict(int, weekend_history),
+                                 friday_history=defaultdict(int, friday_history), availability=availability)
+
+        assert sorted(new_map) == dates
+        assert all(availability.is_available(doc, d) for d, doc in new_map.items())
+        assert {cell.date for cell in cells if cell.old != cell.new} >= changed
+        full_gaps, full_spacings = rule_violations(full_map)
+        gaps, spacings = rule_violations(new_map)
+        assert gaps <= full_gaps and spacings <= full_spacings
+        # the histories hold the re-solved month, not the old one
+        weekend_counts, friday_counts = defaultdict(int, weekend_history), defaultdict(int, friday_history)
+        for d, doc in new_map.items():
+            if d.weekday() >= 5:
+                weekend_counts[doc] += 1
+            elif d.weekday() == 4:
+                friday_counts[doc] += 1
+        assert all(history[0][doc] == weekend_counts[doc] for doc in doctors)
+        assert all(history[1][doc] == friday_counts[doc] for doc in doctors)
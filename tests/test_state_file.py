@@ -0,0 +1,81 @@
+from datetime import date
+
+import pytest
+
+from scheduler_core import Availability, solve_range, state_file
+from scheduler_core.store import AssignmentStore
+
+DOCTORS = ["Αθηνά", "Bob", "Chen", "Dana", "Eve"]
+
+
+def solved_state():
+    assignments = AssignmentStore()
+    months = []
+    for result in solve_range((2025, 1), (2025, 3), DOCTORS):
+        assignments.update(result.assignments)
+        months.append(result.ym)
+    weekend_history, friday_history = result.state.histories()
+    av = Availability()
+    av.add_leave("Bob", date(2025, 2, 3), date(2025, 2, 9))
+    av.add_leave("Bob", date(2024, 12, 30))
+    av.set_weekdays("Eve", [0, 2, 4])
+    return {
+        "prev_assignments": assignments,
+        "weekend_history": dict(weekend_history),
+        "friday_history": dict(friday_history),
+        "generated_months": months,
+        "holidays": {(2025, 2): {3, 14}},
+        "doctors": DOCTORS,
+        "availability": av,
+    }
+
+
+def test_round_trip(tmp_path):
+    state = solved_state()
+    path = tmp_path / "state.sched"
+    state_file.save_state(path, state)
+    loaded = state_file.load_state(path)
+    assert dict(loaded["prev_assignments"].items()) == dict(state["prev_assignments"].items())
+    assert loaded["weekend_history"] == {k: v for k, v in state["weekend_history"].items() if v}
+    assert loaded["friday_history"] == {k: v for k, v in state["friday_history"].items() if v}
+    assert loaded["generated_months"] == state["generated_months"]
+    assert loaded["holidays"] == state["holidays"]
+    assert loaded["doctors"] == DOCTORS
+
+
+def test_leave_round_trip(tmp_path):
+    state = solved_state()
+    path = tmp_path / "state.sched"
+    state_file.save_state(path, state)
+    loaded = state_file.load_state(path)["availability"]
+    assert loaded.fingerprint() == state["availability"].fingerprint()
+    assert not loaded.is_available("Bob", date(2025, 2, 5))
+    assert not loaded.is_available("Eve", date(2025, 2, 4))
+
+
+def test_month_reads_slice(tmp_path):
+    state = solved_state()
+    path = tmp_path / "state.sched"
+    state_file.save_state(path, state)
+    with state_file.StateFile(path) as f:
+        feb = f.month((2025, 2))
+        assert feb == {d: doc for d, doc in state["prev_assignments"].items() if d.month == 2}
+        assert f.month_holidays((2025, 2)) == {3, 14}
+
+
+def test_damaged_files_raise_state_format_error(tmp_path):
+    good = state_file.encode_state(solved_state())
+    name_at = state_file.HEADER.size
+    damaged = [
+        b"",
+        good[:10],
+        good[:len(good) // 2],
+        good[:name_at] + b"\xff\xff" + good[name_at + 2:],                      # name length past the end
+        good[:name_at + 2] + b"\xff\xfe" + good[name_at + 4:],                  # invalid UTF-8 in a name
+        good[:-3],                                                              # truncated weekday section
+    ]
+    for i, data in enumerate(damaged):
+        path = tmp_path / f"bad{i}.sched"
+        path.write_bytes(data)
+        with pytest.raises(state_file.StateFormatError):
+            state_file.load_state(path)
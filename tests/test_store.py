@@ -0,0 +1,54 @@
+import pickle
+import random
+from datetime import date, timedelta
+
+from scheduler_core import AssignmentStore
+
+
+def recount(store):
+    counts = {}
+    for d, doc in store.items():
+        counts.setdefault(doc, [0]*7)[d.weekday()] += 1
+    return counts
+
+
+def assert_counts_match(store, doctors):
+    expected = recount(store)
+    for doc in doctors:
+        for weekday in range(7):
+            assert store.count(doc, weekday) == expected.get(doc, [0]*7)[weekday]
+
+
+def test_counters_follow_assign_reassign_and_remove():
+    store = AssignmentStore()
+    saturday = date(2025, 3, 1)
+    store[saturday] = "A"
+    assert store.count("A", 5) == 1
+    store[saturday] = "B"
+    assert (store.count("A", 5), store.count("B", 5)) == (0, 1)
+    del store[saturday]
+    assert store.count("B", 5) == 0
+    assert store.count("nobody", 5) == 0
+
+
+def test_counters_agree_with_a_recount():
+    rng = random.Random(0)
+    doctors = ["A", "B", "C", "D"]
+    days = [date(2025, 1, 1) + timedelta(days=i) for i in range(60)]
+    store = AssignmentStore({d: rng.choice(doctors) for d in days[:20]})
+    for _ in range(500):
+        d, op = rng.choice(days), rng.random()
+        if op < 0.5:
+            store[d] = rng.choice(doctors)
+        elif op < 0.7:
+            store.pop(d, None)
+        elif op < 0.8:
+            store.update({rng.choice(days): rng.choice(doctors) for _ in range(3)})
+        elif op < 0.9:
+            store.setdefault(d, rng.choice(doctors))
+        elif store:
+            store.popitem()
+    assert_counts_match(store, doctors)
+    assert_counts_match(pickle.loads(pickle.dumps(store)), doctors)
+    store.clear()
+    assert_counts_match(store, doctors)